@@ -19,6 +19,7 @@ from os import getcwd
 import pagermaid.update
 from pagermaid.config import Config
 from pagermaid.scheduler import scheduler
+from pagermaid.single_utils import ReadContext
 import pyromod.listen
 from pyrogram import Client
 
@@ -28,7 +29,7 @@ CMD_LIST = {}
 module_dir = __path__[0]
 working_dir = getcwd()
 # solve same process
-read_context = {}
+read_context = ReadContext()
 help_messages = {}
 hook_functions: Dict[str, Set[Callable[[], Awaitable[None]]]] = {
     "startup": set(),
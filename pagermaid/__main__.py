@@ -6,7 +6,9 @@ from sys import path, platform, exit
 from pyrogram.errors import AuthKeyUnregistered
 
 from pagermaid import bot, logs, working_dir, Config
+from pagermaid.common.executor import executor
 from pagermaid.common.reload import load_all
+from pagermaid.common.watchdog import loop_watchdog
 from pagermaid.single_utils import safe_remove
 from pagermaid.utils import lang, process_exit
 from pagermaid.web import web
@@ -68,6 +70,7 @@ async def web_bot():
 
 async def main():
     logs.info(lang("platform") + platform + lang("platform_load"))
+    loop_watchdog.start()
     await web.start()
     if not (Config.WEB_ENABLE and Config.WEB_LOGIN):
         await console_bot()
@@ -78,6 +81,8 @@ async def main():
     try:
         await idle()
     finally:
+        loop_watchdog.stop()
+        executor.shutdown()
         try:
             await bot.stop()
         except ConnectionError:
@@ -0,0 +1,516 @@
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+from importlib.util import find_spec
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Dict, List, Optional, Set
+
+from pagermaid.config import Config
+
+backup_path = Path("backups")
+BACKUP_SOURCES = ("data", "plugins")
+# big media files written by plugins, not worth backing up
+EXCLUDE_SUFFIXES = (".mp3", ".jpg", ".flac", ".ogg", ".tmp", "-journal")
+# sqlite databases are copied through the backup api to get a consistent snapshot
+SNAPSHOT_SUFFIXES = (".sqlite", ".session", ".db")
+MANIFEST_NAME = "pagermaid_manifest.json"
+CHUNK_READ_SIZE = 1024 * 1024
+# restorable components, matched against the archive path
+COMPONENTS: Dict[str, Callable[[str], bool]] = {
+    "plugins": lambda path: path.startswith("plugins/"),
+    "sqlite": lambda path: path.startswith("data/")
+    and path.endswith((".sqlite", ".db")),
+    "session": lambda path: path.endswith(".session"),
+    "data": lambda path: path.startswith("data/"),
+}
+
+
+class BackupError(Exception):
+    """The archive is damaged, tampered with or not a PagerMaid backup."""
+
+
+class MissingBaseError(BackupError):
+    """A delta archive is restored without the archive it is based on."""
+
+
+class HashingReader:
+    """File wrapper hashing everything tarfile reads from it."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.hash.update(data)
+        return data
+
+
+class ChunkWriter(io.RawIOBase):
+    """Write a stream into `name.001`, `name.002`... parts of at most chunk_size."""
+
+    def __init__(self, path: Path, chunk_size: int):
+        super().__init__()
+        self.path = path
+        self.chunk_size = chunk_size
+        self.parts: List[Path] = []
+        self.file: Optional[BinaryIO] = None
+        self.written = 0
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def _next_part(self):
+        if self.file:
+            self.file.close()
+        part = self.path.with_name(f"{self.path.name}.{len(self.parts) + 1:03d}")
+        self.parts.append(part)
+        self.file = open(part, "wb")
+        self.written = 0
+
+    def write(self, data) -> int:
+        view = memoryview(data)
+        while view:
+            if self.file is None or self.written >= self.chunk_size:
+                self._next_part()
+            size = min(len(view), self.chunk_size - self.written)
+            self.file.write(view[:size])
+            self.written += size
+            self.size += size
+            view = view[size:]
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        if self.file:
+            self.file.close()
+        # a single part keeps the plain archive name
+        if len(self.parts) == 1:
+            os.replace(self.parts[0], self.path)
+            self.parts = [self.path]
+        super().close()
+
+
+class ChunkReader(io.RawIOBase):
+    """Read `name.001`, `name.002`... parts back as one stream."""
+
+    def __init__(self, parts: List[Path]):
+        super().__init__()
+        self.parts = list(parts)
+        self.file: Optional[BinaryIO] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self.file is None:
+                if not self.parts:
+                    return 0
+                self.file = open(self.parts.pop(0), "rb")
+            if size := self.file.readinto(buffer):
+                return size
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+        super().close()
+
+
+class BackupResult:
+    __slots__ = ("id", "full", "parts", "changed", "deleted", "size")
+
+    def __init__(self, backup_id: str, full: bool, parts: List[Path]):
+        self.id = backup_id
+        self.full = full
+        self.parts = parts
+        self.changed = 0
+        self.deleted = 0
+        self.size = 0
+
+
+class RestoreResult:
+    __slots__ = ("restored", "deleted", "verified")
+
+    def __init__(self):
+        self.restored = 0
+        self.deleted = 0
+        # False for archives made before manifests were embedded
+        self.verified = True
+
+
+class BackupManager:
+    """
+    增量备份：只打包与上次备份相比发生变化的文件，完整备份与之后的增量备份组成可恢复的备份链
+    """
+
+    def __init__(self, path: Path = backup_path):
+        self.path = path
+        self.state_path = path / "manifest.json"
+
+    def load_state(self) -> Dict:
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"chain": [], "archives": {}, "files": {}}
+
+    def save_state(self, state: Dict):
+        temp_path = self.state_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    @staticmethod
+    def compression() -> str:
+        if Config.BACKUP_COMPRESSION == "zstd" and find_spec("zstandard"):
+            return "zst"
+        return "gz"
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open_compressed(raw: BinaryIO, compression: str):
+        if compression == "zst":
+            import zstandard
+
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+        try:
+            yield stream
+        finally:
+            stream.close()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open_decompressed(raw: BinaryIO, compression: str):
+        if compression == "zst":
+            import zstandard
+
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        else:
+            stream = gzip.GzipFile(fileobj=raw, mode="rb")
+        try:
+            yield stream
+        finally:
+            stream.close()
+
+    @staticmethod
+    def scan() -> Dict[str, os.stat_result]:
+        files = {}
+        for source in BACKUP_SOURCES:
+            for root, dirs, names in os.walk(source):
+                dirs[:] = [i for i in dirs if i != "__pycache__"]
+                for name in names:
+                    if name.endswith(EXCLUDE_SUFFIXES):
+                        continue
+                    path = os.path.join(root, name)
+                    with contextlib.suppress(OSError):
+                        files[Path(path).as_posix()] = os.stat(path)
+        return files
+
+    @staticmethod
+    def snapshot(path: str, temp_dir: str) -> str:
+        """Copy a sqlite database with the backup api, fall back to the file itself."""
+        target = os.path.join(temp_dir, "snapshot")
+        try:
+            source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                destination = sqlite3.connect(target)
+                with destination:
+                    source.backup(destination)
+                destination.close()
+            finally:
+                source.close()
+            return target
+        except sqlite3.Error:
+            return path
+
+    def add_file(
+        self, tar: tarfile.TarFile, path: str, temp_dir: str
+    ) -> Optional[Dict]:
+        """
+        Skip a file that can not be opened, a read error once its header is written
+        would corrupt the stream, so it fails the backup instead.
+        """
+        try:
+            stat = os.stat(path)
+            source = (
+                self.snapshot(path, temp_dir)
+                if path.endswith(SNAPSHOT_SUFFIXES)
+                else path
+            )
+            f = open(source, "rb")
+        except OSError:
+            return None
+        with f:
+            try:
+                info = tar.gettarinfo(arcname=path, fileobj=f)
+            except OSError:
+                return None
+            info.mtime = stat.st_mtime
+            reader = HashingReader(f)
+            try:
+                tar.addfile(info, reader)
+            except OSError as e:
+                raise BackupError(f"Can not read {path}: {e}") from e
+        return {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": reader.hash.hexdigest(),
+        }
+
+    def create(self, full: bool = False) -> Optional[BackupResult]:
+        """
+        Write a full or delta archive, return None when nothing changed.
+        Raise BackupError when a file fails while it is being archived.
+        Runs blocking io, call it from a worker thread.
+        """
+        self.path.mkdir(exist_ok=True)
+        state = self.load_state()
+        full = (
+            full or not state["chain"] or len(state["chain"]) > Config.BACKUP_MAX_DELTAS
+        )
+        old_files: Dict[str, Dict] = {} if full else state["files"]
+        current = self.scan()
+        changed = [
+            path
+            for path, stat in current.items()
+            if path not in old_files
+            or old_files[path]["mtime"] != stat.st_mtime_ns
+            or old_files[path]["size"] != stat.st_size
+        ]
+        deleted = [path for path in old_files if path not in current]
+        if not changed and not deleted:
+            return None
+
+        backup_id = base_id = time.strftime("%Y%m%d%H%M%S")
+        while not full and backup_id in state["archives"]:
+            backup_id = f"{base_id}-{len(state['archives'])}"
+        compression = self.compression()
+        name = (
+            f"pagermaid_backup.{backup_id}.{'full' if full else 'delta'}"
+            f".tar.{compression}"
+        )
+        files = {
+            path: old_files[path]
+            for path in current
+            if path in old_files and path not in changed
+        }
+        added = {}
+        raw = ChunkWriter(self.path / name, Config.BACKUP_CHUNK_SIZE * 1024 * 1024)
+        try:
+            with raw, tempfile.TemporaryDirectory() as temp_dir:
+                with self.open_compressed(raw, compression) as stream:
+                    with tarfile.open(fileobj=stream, mode="w|") as tar:
+                        for path in changed:
+                            if entry := self.add_file(tar, path, temp_dir):
+                                added[path] = files[path] = entry
+                        manifest = json.dumps(
+                            {
+                                "version": 1,
+                                "id": backup_id,
+                                "type": "full" if full else "delta",
+                                "base": None if full else state["chain"][-1],
+                                "changed": added,
+                                "deleted": deleted,
+                                "files": files,
+                            }
+                        ).encode("utf-8")
+                        info = tarfile.TarInfo(MANIFEST_NAME)
+                        info.size = len(manifest)
+                        info.mtime = int(time.time())
+                        tar.addfile(info, io.BytesIO(manifest))
+        except BaseException:
+            # the chain is left as it was, drop the unfinished archive
+            for part in raw.parts:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(part)
+            raise
+
+        if full:
+            # a new full backup starts a new chain, drop the old one
+            for parts in state["archives"].values():
+                for part in parts:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(self.path / part)
+            state = {"chain": [], "archives": {}, "files": {}}
+        state["chain"].append(backup_id)
+        state["archives"][backup_id] = [i.name for i in raw.parts]
+        state["files"] = files
+        self.save_state(state)
+
+        result = BackupResult(backup_id, full, raw.parts)
+        result.changed = len(added)
+        result.deleted = len(deleted)
+        result.size = raw.size
+        return result
+
+    def local_chain(self) -> List[List[Path]]:
+        """Parts of every archive of the local chain, oldest first."""
+        state = self.load_state()
+        return [
+            [self.path / part for part in state["archives"][backup_id]]
+            for backup_id in state["chain"]
+        ]
+
+    @staticmethod
+    def safe_path(name: str) -> Optional[str]:
+        path = PurePosixPath(name)
+        if (
+            path.is_absolute()
+            or ".." in path.parts
+            or not path.parts
+            or path.parts[0] not in BACKUP_SOURCES
+        ):
+            return None
+        return path.as_posix()
+
+    def extract(
+        self, parts: List[Path], staging: Path, selected: Callable[[str], bool]
+    ) -> Dict:
+        """Stream one archive into the staging dir and verify it against its manifest."""
+        compression = "zst" if ".tar.zst" in parts[0].name else "gz"
+        manifest: Optional[Dict] = None
+        hashes: Dict[str, str] = {}
+        with io.BufferedReader(ChunkReader(parts)) as raw, self.open_decompressed(
+            raw, compression
+        ) as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                if member.name == MANIFEST_NAME:
+                    manifest = json.load(tar.extractfile(member))
+                    continue
+                path = self.safe_path(member.name)
+                if path is None:
+                    raise BackupError(f"Unsafe path in archive: {member.name}")
+                if not member.isfile() or not selected(path):
+                    continue
+                target = staging / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                digest = hashlib.sha256()
+                with tar.extractfile(member) as source, open(target, "wb") as f:
+                    while chunk := source.read(CHUNK_READ_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+                hashes[path] = digest.hexdigest()
+        if manifest is None:
+            # archives without a manifest are always full ones
+            return {
+                "id": None,
+                "type": "full",
+                "base": None,
+                "changed": hashes,
+                "deleted": [],
+                "verified": False,
+            }
+        expected = {
+            path: entry["sha256"]
+            for path, entry in manifest["changed"].items()
+            if selected(path)
+        }
+        if expected != hashes:
+            raise BackupError(f"Checksum mismatch in {parts[0].name}")
+        return {
+            "id": manifest["id"],
+            "type": manifest["type"],
+            "base": manifest["base"],
+            "changed": hashes,
+            "deleted": [i for i in manifest["deleted"] if selected(i)],
+            "verified": True,
+        }
+
+    @staticmethod
+    def swap(staging: Path, files: Set[str], deleted: Set[str]):
+        """Move staged files into place, roll back every move if one fails."""
+        old = staging / ".old"
+        moved = []
+        try:
+            for path in sorted(files | deleted):
+                target, saved = Path(path), None
+                if target.exists():
+                    saved = old / path
+                    saved.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(target, saved)
+                moved.append((target, saved))
+                if path in files:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(staging / path, target)
+        except OSError:
+            for target, saved in reversed(moved):
+                with contextlib.suppress(OSError):
+                    if saved:
+                        os.replace(saved, target)
+                    elif target.exists():
+                        os.remove(target)
+            raise
+
+    def restore(
+        self, archives: List[List[Path]], components: Optional[Set[str]] = None
+    ) -> RestoreResult:
+        """
+        Restore a chain of archives (full first, then deltas), limited to components.
+        Nothing is touched unless every archive extracts, verifies and is based on
+        the archive before it, a delta without its base raises MissingBaseError.
+        Runs blocking io, call it from a worker thread.
+        """
+        if components:
+            checks = [COMPONENTS[i] for i in components]
+
+            def selected(path: str) -> bool:
+                return any(check(path) for check in checks)
+
+        else:
+
+            def selected(path: str) -> bool:
+                return True
+
+        result = RestoreResult()
+        self.path.mkdir(exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".restore-", dir=self.path))
+        try:
+            files: Set[str] = set()
+            deleted: Set[str] = set()
+            previous = None
+            for parts in archives:
+                try:
+                    changes = self.extract(parts, staging, selected)
+                except (OSError, EOFError, ValueError, tarfile.TarError) as e:
+                    raise BackupError(f"Can not read {parts[0].name}: {e}") from e
+                if changes["type"] != "full" and (
+                    previous is None or changes["base"] != previous
+                ):
+                    raise MissingBaseError(
+                        f"{parts[0].name} is a delta of {changes['base']}, "
+                        "restore its chain from the full backup"
+                    )
+                previous = changes["id"]
+                result.verified &= changes["verified"]
+                files |= set(changes["changed"])
+                deleted -= set(changes["changed"])
+                for path in changes["deleted"]:
+                    files.discard(path)
+                    deleted.add(path)
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(staging / path)
+            deleted = {i for i in deleted if os.path.exists(i)}
+            self.swap(staging, files, deleted)
+            result.restored = len(files)
+            result.deleted = len(deleted)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return result
+
+
+backup_manager = BackupManager()
@@ -1,37 +1,210 @@
+import asyncio
 import datetime
 import functools
 import inspect
-from typing import Any, Dict, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
-from pydantic import BaseModel
+# every cache created by @cache, by qualified function name
+caches: Dict[str, "AsyncCache"] = {}
 
 
-class Cache(BaseModel):
-    value: Any
-    time: Optional[datetime.datetime]
+class CacheStats:
+    __slots__ = ("hits", "misses", "stale", "coalesced", "evictions", "errors")
 
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        # expired values served while being refreshed in the background
+        self.stale = 0
+        # misses that waited for a call already in flight
+        self.coalesced = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def dict(self) -> Dict:
+        return {i: getattr(self, i) for i in self.__slots__}
+
+
+def default_key(*args, **kwargs) -> Hashable:
+    """Arguments as a tuple, objects without __eq__ (like Client) compare by identity."""
+    key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+    try:
+        hash(key)
+    except TypeError:
+        return repr(key)
+    return key
+
+
+def signature_key(func: Callable) -> Callable[..., Hashable]:
+    """
+    default_key of the arguments in parameter order with the defaults of func
+    filled in, so f(1), f(a=1) and f(1, b=2) share one entry when b defaults to 2.
+    Names and defaults are read once here, calls only merge them.
+    """
+    parameters = inspect.signature(func).parameters.values()
+    if any(
+        i.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        for i in parameters
+    ):
+        return default_key
+    names = tuple(i.name for i in parameters)
+    defaults = {i.name: i.default for i in parameters if i.default is not i.empty}
+    size = len(names)
+
+    def key(*args, **kwargs) -> Hashable:
+        if not kwargs and len(args) == size:
+            return default_key(*args)
+        values = {**defaults, **kwargs, **dict(zip(names, args))}
+        try:
+            return default_key(*[values[i] for i in names])
+        except KeyError:
+            # a required argument is missing, the call itself will fail
+            return default_key(*args, **kwargs)
+
+    return key
+
+
+class AsyncCache:
+    """
+    协程结果缓存：LRU 淘汰、TTL 过期、并发未命中合并为一次调用，
+    可在后台刷新的同时返回过期值
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        ttl: float,
+        maxsize: int = 128,
+        key: Callable[..., Hashable] = default_key,
+        stale: float = 0,
+    ):
+        self.func = func
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.key = key
+        self.stale = stale
+        # key -> (stored at, value)
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = CacheStats()
+        # bumped by clear(), loads started before it do not store their result
+        self.generation = 0
+
+    def _store(self, key: Hashable, value: Any):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _done(self, key: Hashable, generation: int, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.stats.errors += 1
+        elif generation == self.generation:
+            self._store(key, task.result())
+
+    def _load(self, key: Hashable, args, kwargs) -> asyncio.Task:
+        if task := self.in_flight.get(key):
+            self.stats.coalesced += 1
+            return task
+        task = asyncio.ensure_future(self.func(*args, **kwargs))
+        task.add_done_callback(functools.partial(self._done, key, self.generation))
+        self.in_flight[key] = task
+        return task
+
+    async def __call__(self, *args, **kwargs):
+        key = self.key(*args, **kwargs)
+        if entry := self.entries.get(key):
+            age = time.monotonic() - entry[0]
+            if age <= self.ttl:
+                self.stats.hits += 1
+                self.entries.move_to_end(key)
+                return entry[1]
+            if age <= self.ttl + self.stale:
+                self.stats.stale += 1
+                self.entries.move_to_end(key)
+                self._load(key, args, kwargs)
+                return entry[1]
+        self.stats.misses += 1
+        # shielded, a cancelled caller does not cancel the call other callers wait for
+        return await asyncio.shield(self._load(key, args, kwargs))
+
+    def invalidate(self, *args, **kwargs):
+        self.entries.pop(self.key(*args, **kwargs), None)
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+        # calls after clear() start a new load instead of joining a stale one
+        self.in_flight.clear()
+
+    def dict(self) -> Dict:
+        return {"size": len(self.entries), "maxsize": self.maxsize, **self.stats.dict()}
+
+
+def _seconds(value) -> float:
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    return float(value or 0)
+
+
+def cache(
+    ttl=datetime.timedelta(minutes=15),
+    maxsize: int = 128,
+    key: Optional[Callable[..., Hashable]] = None,
+    stale=None,
+):
+    """
+    Cache the result of a coroutine function.
+
+    :param ttl: how long a result is fresh
+    :param maxsize: entries kept, least recently used are evicted first
+    :param key: builds the cache key from the call arguments, defaults to the
+        arguments with the defaults of the function applied
+    :param stale: how long after ttl an expired result is still served while refreshing
+    """
 
-def cache(ttl=datetime.timedelta(minutes=15)):
     def wrap(func):
-        cache_data: Dict[str, Cache] = {}
+        data = AsyncCache(
+            func, _seconds(ttl), maxsize, key or signature_key(func), _seconds(stale)
+        )
+        caches[func.__qualname__] = data
 
         @functools.wraps(func)
         async def wrapped(*args, **kw):
-            nonlocal cache_data
-            bound = inspect.signature(func).bind(*args, **kw)
-            bound.apply_defaults()
-            ins_key = "|".join([f"{k}_{v}" for k, v in bound.arguments.items()])
-            data: Cache = cache_data.get(ins_key, Cache(value=None, time=None))
-            now = datetime.datetime.now()
-            if (not data.time) or ((now - data.time) > ttl):
-                try:
-                    data.value = await func(*args, **kw)
-                    data.time = datetime.datetime.now()
-                    cache_data[ins_key] = data
-                except Exception as e:
-                    raise e
-            return data.value
+            return await data(*args, **kw)
 
+        wrapped.cache = data
+        wrapped.cache_clear = data.clear
+        wrapped.cache_invalidate = data.invalidate
         return wrapped
 
     return wrap
+
+
+def prometheus_lines() -> List[str]:
+    lines = [
+        "# HELP pagermaid_cache_requests_total Cache lookups by result.",
+        "# TYPE pagermaid_cache_requests_total counter",
+    ]
+    for name, data in caches.items():
+        for result in ("hits", "misses", "stale", "coalesced"):
+            lines.append(
+                f'pagermaid_cache_requests_total{{cache="{name}",result="{result}"}} '
+                f"{getattr(data.stats, result)}"
+            )
+    lines += [
+        "# HELP pagermaid_cache_size Entries held by a cache.",
+        "# TYPE pagermaid_cache_size gauge",
+    ]
+    lines += [
+        f'pagermaid_cache_size{{cache="{name}"}} {len(data.entries)}'
+        for name, data in caches.items()
+    ]
+    return lines
@@ -0,0 +1,259 @@
+import asyncio
+import contextlib
+from os import sep
+from typing import Dict, List, Optional, Set
+
+from pyrogram import Client, raw, utils
+from pyrogram.enums import ChatType
+from pyrogram.handlers import RawUpdateHandler
+from sqlitedict import SqliteDict
+
+from pagermaid.single_utils import sqlite
+
+# one row per dialog, key: chat id, value: id, type, title and username
+dialog_sqlite = SqliteDict(
+    f"data{sep}data.sqlite", tablename="dialogs", autocommit=False
+)
+# seconds to batch index changes before committing them
+FLUSH_DELAY = 5
+
+
+class ChatSummary:
+    """The few chat fields the web pages use, instead of a whole pyrogram Chat."""
+
+    __slots__ = ("id", "type", "title", "username")
+
+    def __init__(
+        self, chat_id: int, chat_type: str, title: str, username: Optional[str]
+    ):
+        self.id = chat_id
+        self.type = chat_type
+        self.title = title
+        self.username = username
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> "ChatSummary":
+        return cls(entry["id"], entry["type"], entry["title"] or "", entry["username"])
+
+    def match(self, keywords: str) -> bool:
+        keywords = keywords.casefold()
+        return (
+            keywords in self.title.casefold()
+            or keywords in (self.username or "").casefold()
+            or keywords in str(self.id)
+        )
+
+    def dict(self) -> Dict:
+        return {i: getattr(self, i) for i in self.__slots__}
+
+
+class DialogIndex:
+    """
+    对话索引：首次使用时遍历一次全部对话，之后根据原始更新增量维护，
+    并按类型维护计数
+    """
+
+    def __init__(self):
+        self.entries: Optional[Dict[int, Dict]] = None
+        self.counts: Dict[str, int] = {i.value: 0 for i in ChatType}
+        self.dirty: Set[int] = set()
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.lock = asyncio.Lock()
+        self._built: Optional[bool] = None
+
+    @property
+    def built(self) -> bool:
+        # read once, raw updates check it before the first build
+        if self._built is None:
+            self._built = sqlite.get("dialog_index_built", False)
+        return self._built
+
+    def attach(self, client: Client):
+        """
+        Keep the index current from raw updates, in its own group so it never
+        takes an update away from other handlers.
+        """
+        client.add_handler(RawUpdateHandler(self.on_raw_update), group=-1)
+
+    def _load(self) -> Dict[int, Dict]:
+        if self.entries is None:
+            self.entries = {}
+            for entry in dialog_sqlite.values():
+                self._add(entry)
+        return self.entries
+
+    def _add(self, entry: Dict):
+        if old := self.entries.get(entry["id"]):
+            self.counts[old["type"]] -= 1
+        self.entries[entry["id"]] = entry
+        self.counts[entry["type"]] += 1
+
+    def _remove(self, chat_id: int):
+        if old := self.entries.pop(chat_id, None):
+            self.counts[old["type"]] -= 1
+
+    async def build(self, client: Client):
+        """Walk every dialog once and replace the index."""
+        entries = {}
+        async for dialog in client.get_dialogs():
+            chat = dialog.chat
+            if not chat:
+                continue
+            entries[chat.id] = {
+                "id": chat.id,
+                "type": chat.type.value,
+                "title": chat.title
+                or " ".join(filter(None, [chat.first_name, chat.last_name])),
+                "username": chat.username,
+            }
+        dialog_sqlite.clear()
+        dialog_sqlite.update({str(k): v for k, v in entries.items()})
+        dialog_sqlite.commit()
+        self.entries, self.dirty = {}, set()
+        self.counts = {i.value: 0 for i in ChatType}
+        for entry in entries.values():
+            self._add(entry)
+        sqlite["dialog_index_built"] = self._built = True
+
+    async def ensure(self, client: Client, rebuild: bool = False) -> Dict[int, Dict]:
+        async with self.lock:
+            if rebuild or not self.built:
+                await self.build(client)
+            return self._load()
+
+    async def get_counts(self, client: Client) -> Dict[str, int]:
+        await self.ensure(client)
+        return self.counts
+
+    async def query(
+        self, client: Client, types: Optional[Set[ChatType]] = None
+    ) -> List[Dict]:
+        entries = await self.ensure(client)
+        if not types:
+            return list(entries.values())
+        values = {i.value for i in types}
+        return [i for i in entries.values() if i["type"] in values]
+
+    async def summaries(
+        self, client: Client, types: Optional[Set[ChatType]] = None
+    ) -> List[ChatSummary]:
+        return [ChatSummary.from_entry(i) for i in await self.query(client, types)]
+
+    def _changed(self, chat_id: int):
+        self.dirty.add(chat_id)
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                FLUSH_DELAY, self.flush
+            )
+
+    def flush(self):
+        self.flush_handle = None
+        if not self.dirty or self.entries is None:
+            return
+        for chat_id in self.dirty:
+            if entry := self.entries.get(chat_id):
+                dialog_sqlite[str(chat_id)] = entry
+            else:
+                with contextlib.suppress(KeyError):
+                    del dialog_sqlite[str(chat_id)]
+        self.dirty.clear()
+        dialog_sqlite.commit(blocking=False)
+
+    @staticmethod
+    def _project(peer) -> Optional[Dict]:
+        """Index entry of a raw user / chat / channel, None when it is not a dialog."""
+        if isinstance(peer, raw.types.User):
+            return {
+                "id": peer.id,
+                "type": (ChatType.BOT if peer.bot else ChatType.PRIVATE).value,
+                "title": " ".join(filter(None, [peer.first_name, peer.last_name])),
+                "username": peer.username,
+            }
+        if isinstance(peer, raw.types.Chat):
+            if peer.left or peer.deactivated:
+                return None
+            return {
+                "id": -peer.id,
+                "type": ChatType.GROUP.value,
+                "title": peer.title,
+                "username": None,
+            }
+        if isinstance(peer, raw.types.Channel):
+            if peer.left:
+                return None
+            return {
+                "id": utils.get_channel_id(peer.id),
+                "type": (
+                    ChatType.SUPERGROUP if peer.megagroup else ChatType.CHANNEL
+                ).value,
+                "title": peer.title,
+                "username": peer.username,
+            }
+        return None
+
+    @staticmethod
+    def _peer_id(peer) -> Optional[int]:
+        if isinstance(peer, (raw.types.User, raw.types.UserEmpty)):
+            return peer.id
+        if isinstance(peer, (raw.types.Chat, raw.types.ChatForbidden)):
+            return -peer.id
+        if isinstance(peer, (raw.types.Channel, raw.types.ChannelForbidden)):
+            return utils.get_channel_id(peer.id)
+        return None
+
+    def _update_peer(self, peer, add: bool):
+        if getattr(peer, "min", False) or (chat_id := self._peer_id(peer)) is None:
+            return
+        entry = self._project(peer)
+        old = self.entries.get(chat_id)
+        if entry is None:
+            # left, kicked, deactivated or blocked
+            if old and not isinstance(peer, (raw.types.User, raw.types.UserEmpty)):
+                self._remove(chat_id)
+                self._changed(chat_id)
+            return
+        if not old and not add:
+            return
+        # only marked dirty when a field the index serves has changed
+        if entry != old:
+            self._add(entry)
+            self._changed(chat_id)
+
+    async def on_raw_update(self, client: Client, update, users: Dict, chats: Dict):
+        """Keep the index current from raw updates, never stops propagation."""
+        if self.entries is None:
+            if not self.built:
+                return
+            self._load()
+        with contextlib.suppress(Exception):
+            if isinstance(
+                update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage)
+            ):
+                message = update.message
+                peer_id = utils.get_raw_peer_id(message.peer_id)
+                if isinstance(message.peer_id, raw.types.PeerUser):
+                    peer = users.get(peer_id)
+                else:
+                    peer = chats.get(peer_id)
+                if peer is not None:
+                    self._update_peer(peer, True)
+                # the account left a basic group
+                action = getattr(message, "action", None)
+                if (
+                    isinstance(action, raw.types.MessageActionChatDeleteUser)
+                    and client.me
+                    and action.user_id == client.me.id
+                    and peer is not None
+                ):
+                    self._remove(-peer.id)
+                    self._changed(-peer.id)
+            elif isinstance(update, raw.types.UpdateChannel):
+                # raw objects define __len__, compare with None instead of truthiness
+                if (peer := chats.get(update.channel_id)) is not None:
+                    self._update_peer(peer, True)
+            # title / username changes of indexed chats
+            for peer in [*chats.values(), *users.values()]:
+                self._update_peer(peer, False)
+
+
+dialog_index = DialogIndex()
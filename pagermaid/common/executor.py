@@ -0,0 +1,158 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Set, TypeVar
+
+from pagermaid.common.metrics import Histogram
+from pagermaid.config import Config
+
+T = TypeVar("T")
+
+
+class PoolStats:
+    """Queue depth, outcome counters and latency of one pool."""
+
+    __slots__ = ("pending", "completed", "failed", "cancelled", "latency")
+
+    def __init__(self):
+        self.pending: Set[Future] = set()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.latency = Histogram()
+
+    @property
+    def running(self) -> int:
+        return sum(1 for i in self.pending if i.running())
+
+    @property
+    def queued(self) -> int:
+        return len(self.pending) - self.running
+
+    def dict(self) -> Dict:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "latency": self.latency.dict(),
+        }
+
+
+class ExecutorManager:
+    """
+    共享线程池与进程池，用于把 CPU 密集或阻塞的代码移出事件循环
+
+    async def handler(message: Message, executor: ExecutorManager):
+        image = await executor.run_thread(render, data)
+    """
+
+    def __init__(
+        self, max_threads: Optional[int] = None, max_processes: Optional[int] = None
+    ):
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.stats: Dict[str, PoolStats] = {
+            "thread": PoolStats(),
+            "process": PoolStats(),
+        }
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_threads or Config.EXECUTOR_THREADS or None,
+                thread_name_prefix="pagermaid",
+            )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_processes or Config.EXECUTOR_PROCESSES or None
+            )
+        return self._process_pool
+
+    async def _run(
+        self, kind: str, pool: Executor, func: Callable[..., T], *args, **kwargs
+    ) -> T:
+        stats = self.stats[kind]
+        future = pool.submit(functools.partial(func, *args, **kwargs))
+        stats.pending.add(future)
+        start = perf_counter()
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # only queued calls can be cancelled, running ones finish in the background
+            future.cancel()
+            stats.cancelled += 1
+            raise
+        except BaseException:
+            stats.failed += 1
+            raise
+        finally:
+            stats.pending.discard(future)
+            stats.latency.observe(perf_counter() - start)
+        stats.completed += 1
+        return result
+
+    async def run_thread(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking function in the shared thread pool."""
+        return await self._run("thread", self.thread_pool, func, *args, **kwargs)
+
+    async def run_process(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a CPU bound, picklable function in the shared process pool."""
+        return await self._run("process", self.process_pool, func, *args, **kwargs)
+
+    def cancel_pending(self) -> int:
+        """Cancel every call that has not started yet, return how many were cancelled."""
+        return sum(
+            future.cancel() for stats in self.stats.values() for future in stats.pending
+        )
+
+    def shutdown(self, wait: bool = False):
+        self.cancel_pending()
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        self._thread_pool, self._process_pool = None, None
+
+    def dict(self) -> Dict:
+        return {kind: stats.dict() for kind, stats in self.stats.items()}
+
+    def prometheus_lines(self) -> List[str]:
+        lines = [
+            "# HELP pagermaid_executor_queued Calls waiting for a worker.",
+            "# TYPE pagermaid_executor_queued gauge",
+        ]
+        lines += [
+            f'pagermaid_executor_queued{{pool="{kind}"}} {stats.queued}'
+            for kind, stats in self.stats.items()
+        ]
+        lines += [
+            "# HELP pagermaid_executor_running Calls running in a worker.",
+            "# TYPE pagermaid_executor_running gauge",
+        ]
+        lines += [
+            f'pagermaid_executor_running{{pool="{kind}"}} {stats.running}'
+            for kind, stats in self.stats.items()
+        ]
+        lines += [
+            "# HELP pagermaid_executor_calls_total Finished calls by outcome.",
+            "# TYPE pagermaid_executor_calls_total counter",
+        ]
+        for kind, stats in self.stats.items():
+            for outcome in ("completed", "failed", "cancelled"):
+                lines.append(
+                    f'pagermaid_executor_calls_total{{pool="{kind}",outcome="{outcome}"}} '
+                    f"{getattr(stats, outcome)}"
+                )
+        return lines
+
+
+executor = ExecutorManager()
@@ -0,0 +1,165 @@
+import asyncio
+import random
+from importlib.util import find_spec
+from typing import Dict, List, Optional
+
+import httpx
+
+from pagermaid import logs
+from pagermaid.config import Config
+
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class PoolClient(httpx.AsyncClient):
+    """
+    Shared AsyncClient with per-host concurrency limits, retries with jittered
+    exponential backoff for idempotent requests and pool statistics.
+    """
+
+    def __init__(
+        self,
+        *args,
+        per_host: int = 0,
+        retries: int = 0,
+        backoff: float = 0.5,
+        **kwargs,
+    ):
+        self.limits: httpx.Limits = kwargs.get("limits", httpx.Limits())
+        super().__init__(*args, **kwargs)
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.retried = 0
+        self.in_flight: Dict[str, int] = {}
+        # requests waiting for a free slot of their host
+        self.waiting: Dict[str, int] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, host: str) -> Optional[asyncio.Semaphore]:
+        if self.per_host <= 0:
+            return None
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def _send_once(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        host = request.url.host
+        if not (limit := self._host_limit(host)):
+            return await super().send(request, **kwargs)
+        self.waiting[host] = self.waiting.get(host, 0) + 1
+        try:
+            await limit.acquire()
+        finally:
+            self.waiting[host] -= 1
+            if not self.waiting[host]:
+                del self.waiting[host]
+        try:
+            return await super().send(request, **kwargs)
+        finally:
+            limit.release()
+
+    async def _send_with_retry(self, request: httpx.Request, **kwargs):
+        retries = self.retries if request.method in RETRY_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                # the host slot is only held per attempt, not during the backoff
+                response = await self._send_once(request, **kwargs)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+                await response.aclose()
+            self.retried += 1
+            await asyncio.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))
+            attempt += 1
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        host = request.url.host
+        self.requests += 1
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        try:
+            return await self._send_with_retry(request, **kwargs)
+        finally:
+            self.in_flight[host] -= 1
+            if not self.in_flight[host]:
+                del self.in_flight[host]
+
+    def stats(self) -> Dict:
+        connections, idle = 0, 0
+        try:
+            pool_connections = self._transport._pool.connections  # noqa
+            connections = len(pool_connections)
+            idle = sum(1 for i in pool_connections if i.is_idle())
+        except AttributeError:
+            pass
+        return {
+            "requests": self.requests,
+            "retried": self.retried,
+            "in_flight": dict(self.in_flight),
+            "waiting": dict(self.waiting),
+            "connections": connections,
+            "idle_connections": idle,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "per_host": self.per_host,
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        stats = self.stats()
+        lines = [
+            "# HELP pagermaid_http_requests_total Requests sent by the shared client.",
+            "# TYPE pagermaid_http_requests_total counter",
+            f"pagermaid_http_requests_total {stats['requests']}",
+            "# HELP pagermaid_http_retries_total Requests retried after a failure.",
+            "# TYPE pagermaid_http_retries_total counter",
+            f"pagermaid_http_retries_total {stats['retried']}",
+            "# HELP pagermaid_http_connections Open pool connections by state.",
+            "# TYPE pagermaid_http_connections gauge",
+            f'pagermaid_http_connections{{state="active"}} '
+            f"{stats['connections'] - stats['idle_connections']}",
+            f'pagermaid_http_connections{{state="idle"}} {stats["idle_connections"]}',
+            "# HELP pagermaid_http_host_limit Concurrent requests allowed per host, 0 for unlimited.",
+            "# TYPE pagermaid_http_host_limit gauge",
+            f"pagermaid_http_host_limit {stats['per_host']}",
+            "# HELP pagermaid_http_in_flight Requests in progress by host.",
+            "# TYPE pagermaid_http_in_flight gauge",
+        ]
+        lines += [
+            f'pagermaid_http_in_flight{{host="{host}"}} {count}'
+            for host, count in stats["in_flight"].items()
+        ]
+        lines += [
+            "# HELP pagermaid_http_waiting Requests waiting for a host slot by host.",
+            "# TYPE pagermaid_http_waiting gauge",
+        ]
+        lines += [
+            f'pagermaid_http_waiting{{host="{host}"}} {count}'
+            for host, count in stats["waiting"].items()
+        ]
+        return lines
+
+
+def create_client(headers: Optional[Dict] = None) -> PoolClient:
+    http2 = bool(Config.HTTP_HTTP2)
+    if http2 and find_spec("h2") is None:
+        logs.warning("HTTP/2 is enabled but the h2 package is not installed.")
+        http2 = False
+    return PoolClient(
+        timeout=Config.HTTP_TIMEOUT,
+        headers=headers,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        per_host=Config.HTTP_PER_HOST,
+        retries=Config.HTTP_RETRIES,
+        backoff=Config.HTTP_BACKOFF,
+    )
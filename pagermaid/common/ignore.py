@@ -1,22 +1,16 @@
-import json
+from typing import List
 
 from pyrogram.enums import ChatType
 
 from pagermaid import bot
+from pagermaid.common.dialogs import ChatSummary, dialog_index
 from pagermaid.sub_utils import Sub
 
 ignore_groups_manager = Sub("ignore_groups")
 
 
-async def get_group_list():
+async def get_group_list() -> List[ChatSummary]:
     try:
-        return [
-            json.loads(str(dialog.chat))
-            for dialog in await bot.get_dialogs_list()
-            if (
-                dialog.chat
-                and dialog.chat.type in [ChatType.SUPERGROUP, ChatType.GROUP]
-            )
-        ]
+        return await dialog_index.summaries(bot, {ChatType.SUPERGROUP, ChatType.GROUP})
     except BaseException:
         return []
@@ -0,0 +1,136 @@
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from pyrogram import ContinuePropagation
+
+from pagermaid import bot, hook_functions, logs
+from pagermaid.common.registry import module_registry
+import pagermaid.config
+from pagermaid.enums import Client, Message
+from pagermaid.enums.command import CommandHandler
+from pagermaid.listener import listener
+from pagermaid.utils import alias_command
+
+manifest_path = Path("data") / "plugin_manifest.json"
+
+
+class LazyPluginManager:
+    """
+    懒加载插件：首次导入时记录插件的命令元数据，之后启动时只注册占位命令，
+    在命令第一次被触发时才导入插件
+    """
+
+    def __init__(self, path: Path = manifest_path):
+        self.path = path
+        self.manifest: Dict[str, Dict] = {}
+        self.pending: Set[str] = set()
+        self.loaded = False
+        self.dirty = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def save(self):
+        if not self.dirty:
+            return
+        temp_path = self.path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    @staticmethod
+    def is_lazy(module: str) -> bool:
+        """Only plugins that registered nothing but plain command listeners."""
+        record = module_registry.records.get(module)
+        if not record or record.eager or not record.listeners:
+            return False
+        # handlers added with bot.add_handler / @bot.on_message directly
+        for handlers in bot.dispatcher.groups.values():
+            if any(getattr(i.callback, "__module__", None) == module for i in handlers):
+                return False
+        for functions in hook_functions.values():
+            if any(getattr(i, "__module__", None) == module for i in functions):
+                return False
+        return all(
+            getattr(job.func, "__module__", None) != module
+            for job in bot.job.get_jobs()
+        )
+
+    def update(self, plugin_name: str, path: str):
+        """Store the metadata of a plugin that has just been imported."""
+        self.load()
+        module = f"plugins.{plugin_name}"
+        if not (record := module_registry.records.get(module)):
+            return
+        with contextlib.suppress(OSError):
+            self.manifest[plugin_name] = {
+                "hash": module_registry.fingerprint(path)[2],
+                "language": pagermaid.config.Config.LANGUAGE,
+                "lazy": self.is_lazy(module),
+                "listeners": record.listeners,
+            }
+            self.dirty = True
+
+    def get_entry(self, plugin_name: str, path: str) -> Optional[Dict]:
+        self.load()
+        entry = self.manifest.get(plugin_name)
+        if (
+            not entry
+            or not entry["lazy"]
+            or entry["language"] != pagermaid.config.Config.LANGUAGE
+        ):
+            return None
+        try:
+            if module_registry.fingerprint(path)[2] != entry["hash"]:
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def register(self, plugin_name: str, entry: Dict):
+        """Register placeholder commands instead of importing the plugin."""
+        with module_registry.loading(f"plugins.{plugin_name}"):
+            for args in entry["listeners"]:
+                listener(**args)(self.placeholder(plugin_name, args))
+        self.pending.add(plugin_name)
+
+    def discard(self, plugin_name: str):
+        self.pending.discard(plugin_name)
+
+    def ensure(self, plugin_name: str):
+        """Import a pending plugin, replacing its placeholder commands."""
+        module = f"plugins.{plugin_name}"
+        if plugin_name not in self.pending:
+            if module in sys.modules:
+                return sys.modules[module]
+            # unloaded meanwhile, e.g. by a failed reload
+            return module_registry.import_module(module)
+        self.pending.discard(plugin_name)
+        module_registry.unregister(module)
+        logs.debug(f"Lazy loading plugin {plugin_name}")
+        return module_registry.import_module(module)
+
+    def placeholder(self, plugin_name: str, args: Dict):
+        name = alias_command(args["command"], args.get("disallow_alias", False))
+
+        async def lazy_command(client: Client, message: Message):
+            module = self.ensure(plugin_name)
+            for value in vars(module).values():
+                if isinstance(value, CommandHandler) and value._pgp_command__ == name:
+                    return await value.handler(client, message)
+            raise ContinuePropagation
+
+        return lazy_command
+
+
+lazy_plugin_manager = LazyPluginManager()
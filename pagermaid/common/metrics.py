@@ -0,0 +1,203 @@
+import sys
+from bisect import bisect_left
+from types import FrameType
+from typing import Dict, Iterable, List, Optional
+
+# seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-memory latency histogram, one counter per bucket upper bound."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last slot counts values above the largest bucket (+Inf)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        result, total = [], 0
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class CommandMetrics:
+    """Phase latency, error and FloodWait counters of one command."""
+
+    PHASES = ("parse", "pre_hooks", "handler", "post_hooks")
+
+    __slots__ = ("phases", "calls", "errors", "flood_waits")
+
+    def __init__(self):
+        self.phases: Dict[str, Histogram] = {i: Histogram() for i in self.PHASES}
+        self.calls = 0
+        self.errors: Dict[str, int] = {}
+        self.flood_waits = 0
+
+    def observe(self, phase: str, value: float) -> None:
+        self.phases[phase].observe(value)
+
+    def error(self, exception: BaseException, flood: bool = False) -> None:
+        name = type(exception).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+        if flood:
+            self.flood_waits += 1
+
+    def dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "flood_waits": self.flood_waits,
+            "phases": {name: data.dict() for name, data in self.phases.items()},
+        }
+
+
+class CommandMetricsRegistry:
+    def __init__(self):
+        self.commands: Dict[str, CommandMetrics] = {}
+        self.in_flight = 0
+        # frame of a running handler -> its command, the watchdog thread finds
+        # these frames in the stack of the loop thread to attribute stalls
+        self.running: Dict[FrameType, str] = {}
+
+    def get(self, command: str) -> CommandMetrics:
+        if command not in self.commands:
+            self.commands[command] = CommandMetrics()
+        return self.commands[command]
+
+    def track(self, command: str, handler):
+        """Count the in flight handlers of a listener."""
+        self.get(command)
+
+        async def tracked(client, message):
+            frame = sys._getframe()  # noqa
+            self.in_flight += 1
+            self.running[frame] = command
+            try:
+                return await handler(client, message)
+            finally:
+                self.in_flight -= 1
+                self.running.pop(frame, None)
+
+        return tracked
+
+    def rows(self) -> List[Dict]:
+        rows = []
+        for command, metrics in sorted(self.commands.items()):
+            row = {
+                "command": command,
+                "calls": metrics.calls,
+                "errors": sum(metrics.errors.values()),
+                "flood_waits": metrics.flood_waits,
+            }
+            # average milliseconds per phase
+            for name, data in metrics.phases.items():
+                row[name] = round(data.sum / data.count * 1000, 2) if data.count else 0
+            rows.append(row)
+        return rows
+
+
+command_metrics = CommandMetricsRegistry()
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> List[str]:
+    lines = []
+    bounds = [*map(str, histogram.buckets), "+Inf"]
+    for bound, count in zip(bounds, histogram.cumulative()):
+        lines.append(f"{name}_bucket{{{_labels(**labels, le=bound)}}} {count}")
+    lines.append(f"{name}_sum{{{_labels(**labels)}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{_labels(**labels)}}} {histogram.count}")
+    return lines
+
+
+def render_prometheus(
+    hooks: Optional[Dict[str, Histogram]] = None,
+    hook_timeouts: Optional[Dict[str, int]] = None,
+) -> str:
+    """Render command (and hook) metrics in the Prometheus text format."""
+    lines = [
+        "# HELP pagermaid_commands_in_flight Command handlers currently running.",
+        "# TYPE pagermaid_commands_in_flight gauge",
+        f"pagermaid_commands_in_flight {command_metrics.in_flight}",
+        "# HELP pagermaid_command_calls_total Command handler calls.",
+        "# TYPE pagermaid_command_calls_total counter",
+    ]
+    commands = sorted(command_metrics.commands.items())
+    for command, metrics in commands:
+        lines.append(
+            f"pagermaid_command_calls_total{{{_labels(command=command)}}} {metrics.calls}"
+        )
+    lines += [
+        "# HELP pagermaid_command_errors_total Command errors by exception type.",
+        "# TYPE pagermaid_command_errors_total counter",
+    ]
+    for command, metrics in commands:
+        for error, count in sorted(metrics.errors.items()):
+            labels = _labels(command=command, type=error)
+            lines.append(f"pagermaid_command_errors_total{{{labels}}} {count}")
+    lines += [
+        "# HELP pagermaid_command_flood_waits_total FloodWait errors raised by commands.",
+        "# TYPE pagermaid_command_flood_waits_total counter",
+    ]
+    for command, metrics in commands:
+        lines.append(
+            f"pagermaid_command_flood_waits_total{{{_labels(command=command)}}} "
+            f"{metrics.flood_waits}"
+        )
+    lines += [
+        "# HELP pagermaid_command_duration_seconds Command latency by phase.",
+        "# TYPE pagermaid_command_duration_seconds histogram",
+    ]
+    for command, metrics in commands:
+        for phase, histogram in metrics.phases.items():
+            lines += _histogram_lines(
+                "pagermaid_command_duration_seconds",
+                histogram,
+                command=command,
+                phase=phase,
+            )
+    if hooks is not None:
+        lines += [
+            "# HELP pagermaid_hook_duration_seconds Hook latency.",
+            "# TYPE pagermaid_hook_duration_seconds histogram",
+        ]
+        for hook, histogram in sorted(hooks.items()):
+            lines += _histogram_lines(
+                "pagermaid_hook_duration_seconds", histogram, hook=hook
+            )
+    if hook_timeouts is not None:
+        lines += [
+            "# HELP pagermaid_hook_timeouts_total Hooks cancelled by their timeout.",
+            "# TYPE pagermaid_hook_timeouts_total counter",
+        ]
+        for hook, count in sorted(hook_timeouts.items()):
+            lines.append(
+                f"pagermaid_hook_timeouts_total{{{_labels(hook=hook)}}} {count}"
+            )
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,9 @@
+import asyncio
 import contextlib
 import json
 import os
+import time
+from datetime import timedelta
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict
 
@@ -8,12 +11,13 @@ from pydantic import BaseModel, ValidationError
 
 import pagermaid.modules
 from pagermaid import Config, logs
-from pagermaid.enums import Message
 from pagermaid.common.cache import cache
+from pagermaid.enums import Message
 from pagermaid.utils import client
 from pagermaid.services import sqlite
 
 plugins_path = Path("plugins")
+remote_index_path = Path("data") / "remote_plugins.json"
 
 
 class LocalPlugin(BaseModel):
@@ -70,9 +74,12 @@ class RemotePlugin(LocalPlugin):
     async def install(self) -> bool:
         html = await client.get(f"{self.remote_source}{self.name}/main.py")
         if html.status_code == 200:
-            self.remove()
-            with open(plugins_path / f"{self.name}.py", mode="wb") as f:
+            temp_path = plugins_path / f"{self.name}.py.tmp"
+            with open(temp_path, mode="wb") as f:
                 f.write(html.text.encode("utf-8"))
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.disabled_path)
+            os.replace(temp_path, self.normal_path)
             return True
         return False
 
@@ -129,9 +136,91 @@ class PluginRemoteManager:
         return False
 
 
+class RemoteIndex(BaseModel):
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched: float = 0.0
+    plugins: List[Dict] = []
+
+
+class RemoteIndexCache:
+    """
+    On-disk cache of remote list.json files, revalidated with ETag/Last-Modified.
+    Parsed plugin models are kept per remote and rebuilt only when its index changes.
+    """
+
+    def __init__(self, path: Path = remote_index_path, ttl: float = 15 * 60):
+        self.path = path
+        self.ttl = ttl
+        self.indexes: Dict[str, RemoteIndex] = {}
+        self.models: Dict[str, List[RemotePlugin]] = {}
+        self.loaded = False
+
+    def load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        with contextlib.suppress(FileNotFoundError, ValueError, ValidationError):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.indexes = {
+                    url: RemoteIndex(**data) for url, data in json.load(f).items()
+                }
+
+    def save(self):
+        temp_path = self.path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({url: index.dict() for url, index in self.indexes.items()}, f)
+        os.replace(temp_path, self.path)
+
+    def is_fresh(self, url: str) -> bool:
+        index = self.indexes.get(url)
+        return bool(index and time.time() - index.fetched < self.ttl)
+
+    async def fetch(self, url: str, revalidate: bool = True) -> bool:
+        """Refresh the index of one remote, return whether it was requested."""
+        self.load()
+        if not revalidate and self.is_fresh(url):
+            return False
+        headers = {}
+        if index := self.indexes.get(url):
+            if index.etag:
+                headers["If-None-Match"] = index.etag
+            if index.last_modified:
+                headers["If-Modified-Since"] = index.last_modified
+        data = await client.get(f"{url}list.json", headers=headers)
+        if data.status_code == 304 and index:
+            index.fetched = time.time()
+            return True
+        data.raise_for_status()
+        self.indexes[url] = RemoteIndex(
+            url=url,
+            etag=data.headers.get("ETag"),
+            last_modified=data.headers.get("Last-Modified"),
+            fetched=time.time(),
+            plugins=data.json()["list"],
+        )
+        self.models.pop(url, None)
+        return True
+
+    def get_plugins(self, url: str) -> List[RemotePlugin]:
+        if url not in self.models:
+            models = []
+            for plugin in self.indexes[url].plugins:
+                try:
+                    models.append(
+                        RemotePlugin(**plugin, status=False, remote_source=url)
+                    )
+                except ValidationError:
+                    logs.warning(f"远程插件 {plugin} 信息不完整")
+            self.models[url] = models
+        return self.models[url]
+
+
 class PluginManager:
     def __init__(self, remote_manager: PluginRemoteManager):
         self.remote_manager = remote_manager
+        self.index_cache = RemoteIndexCache()
         self.version_map = {}
         self.remote_version_map = {}
         self.plugins: List[LocalPlugin] = []
@@ -144,8 +233,10 @@ class PluginManager:
             self.version_map = json.load(f)
 
     def save_local_version_map(self):
-        with open(plugins_path / "version.json", "w", encoding="utf-8") as f:
+        temp_path = plugins_path / "version.json.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
             json.dump(self.version_map, f, indent=4)
+        os.replace(temp_path, plugins_path / "version.json")
 
     def get_local_version(self, name: str) -> Optional[float]:
         data = self.version_map.get(name)
@@ -198,48 +289,43 @@ class PluginManager:
     def get_local_plugin(self, name: str) -> LocalPlugin:
         return next(filter(lambda x: x.name == name, self.plugins), None)
 
-    @staticmethod
-    async def fetch_remote_url(url: str) -> List[Dict]:
-        try:
-            data = await client.get(f"{url}list.json")
-            data.raise_for_status()
-            return data.json()["list"]
-        except Exception as e:
-            logs.error(f"获取远程插件列表失败: {e}")
-            raise e
-
-    async def load_remote_plugins_no_cache(self) -> List[RemotePlugin]:
+    async def load_remote_plugins_no_cache(
+        self, revalidate: bool = True
+    ) -> List[RemotePlugin]:
+        self.index_cache.load()
         remote_urls = [i.url for i in self.remote_manager.get_remotes()]
         remote_urls.insert(0, Config.GIT_SOURCE)
+        results = await asyncio.gather(
+            *[self.index_cache.fetch(url, revalidate) for url in remote_urls],
+            return_exceptions=True,
+        )
         plugins = []
-        plugins_name = []
-        for remote in remote_urls:
-            try:
-                plugin_list = await self.fetch_remote_url(remote)
-            except Exception as e:
-                logs.error(f"获取远程插件列表失败: {e}")
-                self.remote_manager.disable_remote(remote)
-                continue
-            self.remote_manager.enable_remote(remote)
-            for plugin in plugin_list:
-                try:
-                    plugin_model = RemotePlugin(
-                        **plugin, status=False, remote_source=remote
-                    )
-                    if plugin_model.name in plugins_name:
-                        continue
-                    plugins.append(plugin_model)
-                    plugins_name.append(plugin_model.name)
-                except ValidationError:
-                    logs.warning(f"远程插件 {plugin} 信息不完整")
+        plugins_name = set()
+        for remote, result in zip(remote_urls, results):
+            if isinstance(result, BaseException):
+                logs.error(f"获取远程插件列表失败: {remote} {result!r}")
+                # serve the cached index until the remote is reachable again
+                if remote not in self.index_cache.indexes:
+                    self.remote_manager.disable_remote(remote)
+                    continue
+            elif result is True:
+                self.remote_manager.enable_remote(remote)
+            for plugin_model in self.index_cache.get_plugins(remote):
+                if plugin_model.name in plugins_name:
                     continue
+                plugins.append(plugin_model)
+                plugins_name.add(plugin_model.name)
+        if any(result is True for result in results):
+            self.index_cache.save()
         self.remote_plugins = plugins
         self.remote_version_map = {plugin.name: plugin.version for plugin in plugins}
+        if revalidate:
+            PluginManager.load_remote_plugins_cache.cache_clear()
         return plugins
 
-    @cache()
+    @cache(ttl=timedelta(minutes=1))
     async def load_remote_plugins_cache(self) -> List[RemotePlugin]:
-        return await self.load_remote_plugins_no_cache()
+        return await self.load_remote_plugins_no_cache(revalidate=False)
 
     async def load_remote_plugins(
         self, enable_cache: bool = True
@@ -264,12 +350,34 @@ class PluginManager:
                 return local_version < remote_version
         return False
 
+    async def install_remote_plugins(
+        self, names: List[str], concurrency: int = 8
+    ) -> Dict[str, bool]:
+        """Download plugins concurrently, then save version.json once."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def install(plugin: Optional[RemotePlugin]) -> bool:
+            if not plugin:
+                return False
+            async with semaphore:
+                try:
+                    return await plugin.install()
+                except Exception as e:
+                    logs.warning(f"安装插件 {plugin.name} 失败: {e}")
+                    return False
+
+        names = list(dict.fromkeys(names))
+        plugins = [self.get_remote_plugin(name) for name in names]
+        results = await asyncio.gather(*[install(plugin) for plugin in plugins])
+        for plugin, result in zip(plugins, results):
+            if result:
+                self.version_map[plugin.name] = plugin.version
+        if any(results):
+            self.save_local_version_map()
+        return dict(zip(names, results))
+
     async def install_remote_plugin(self, name: str) -> bool:
-        if plugin := self.get_remote_plugin(name):
-            if await plugin.install():
-                self.set_local_version(name, plugin.version)
-                return True
-        return False
+        return (await self.install_remote_plugins([name]))[name]
 
     async def update_remote_plugin(self, name: str) -> bool:
         if self.plugin_need_update(name):
@@ -277,11 +385,11 @@ class PluginManager:
         return False
 
     async def update_all_remote_plugin(self) -> List[RemotePlugin]:
-        updated_plugins = []
-        for i in self.remote_plugins:
-            if await self.update_remote_plugin(i.name):
-                updated_plugins.append(i)
-        return updated_plugins
+        need_update = [
+            i.name for i in self.remote_plugins if self.plugin_need_update(i.name)
+        ]
+        results = await self.install_remote_plugins(need_update)
+        return [self.get_remote_plugin(name) for name, ok in results.items() if ok]
 
     @staticmethod
     async def download_from_message(message: Message) -> str:
@@ -0,0 +1,75 @@
+import contextlib
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+process = psutil.Process()
+# this module is imported by pagermaid.common.reload, right after the core
+# (config, logging, scheduler, pyrogram) has been imported
+core_imported = time.time()
+
+
+class ImportRecord:
+    __slots__ = ("name", "kind", "seconds", "memory", "lazy", "error")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.seconds = 0.0
+        self.memory = 0
+        self.lazy = False
+        self.error: Optional[str] = None
+
+    def dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "seconds": round(self.seconds, 6),
+            "memory": self.memory,
+            "lazy": self.lazy,
+            "error": self.error,
+        }
+
+
+class StartupProfiler:
+    """Wall time and RSS delta of every module and plugin imported by load_all."""
+
+    def __init__(self):
+        self.records: List[ImportRecord] = []
+        self.core_seconds = core_imported - process.create_time()
+        self.total_seconds = 0.0
+
+    @contextlib.contextmanager
+    def measure(self, name: str, kind: str):
+        record = ImportRecord(name, kind)
+        self.records.append(record)
+        memory = process.memory_info().rss
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exception:
+            record.error = f"{type(exception).__name__}: {exception}"
+            raise
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.memory = process.memory_info().rss - memory
+            self.total_seconds += record.seconds
+
+    def clear(self):
+        self.records.clear()
+        self.total_seconds = 0.0
+
+    def top(self, num: int = 10) -> List[ImportRecord]:
+        return sorted(self.records, key=lambda x: x.seconds, reverse=True)[:num]
+
+    def dict(self) -> Dict:
+        return {
+            "core_seconds": round(self.core_seconds, 6),
+            "total_seconds": round(self.total_seconds, 6),
+            "memory": sum(i.memory for i in self.records),
+            "records": [i.dict() for i in self.top(len(self.records))],
+        }
+
+
+startup_profiler = StartupProfiler()
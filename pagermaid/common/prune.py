@@ -0,0 +1,170 @@
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from pyrogram.errors import ChatAdminRequired, FloodWait, Forbidden
+
+from pagermaid.enums import Client
+
+# telegram deletes at most 100 messages per request
+BATCH_SIZE = 100
+# batches deleted at the same time
+CONCURRENCY = 3
+# seconds between progress callbacks
+PROGRESS_INTERVAL = 3
+# running jobs by chat id, so they can be cancelled
+prune_jobs: Dict[int, "PruneJob"] = {}
+
+
+class AdaptiveRate:
+    """Space out requests, slow down after a FloodWait and speed up again on success."""
+
+    def __init__(self, min_delay: float = 0, max_delay: float = 5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min_delay
+        self.next_at = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        start = max(now, self.next_at)
+        self.next_at = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def success(self):
+        self.delay = max(self.min_delay, self.delay * 0.9)
+
+    def flood(self, seconds: float):
+        self.delay = min(self.max_delay, max(self.delay * 2, 0.1))
+        # every worker waits the flood out
+        self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+
+class PruneJob:
+    """
+    批量删除消息：获取历史与删除并行进行，多个批次并发删除，
+    遇到 FloodWait 自动降速，并定期回调进度
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        chat_id: int,
+        concurrency: int = CONCURRENCY,
+        progress: Optional[Callable[["PruneJob"], Awaitable]] = None,
+    ):
+        self.client = client
+        self.chat_id = chat_id
+        self.concurrency = concurrency
+        self.progress = progress
+        self.rate = AdaptiveRate()
+        self.seen: Set[int] = set()
+        self.collected = 0
+        self.deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        # permission error that aborted the job
+        self.error: Optional[Exception] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.task:
+            self.task.cancel()
+
+    async def _produce(self, source: AsyncIterator[int], queue: asyncio.Queue):
+        batch: List[int] = []
+        async for message_id in source:
+            if message_id in self.seen:
+                continue
+            self.seen.add(message_id)
+            self.collected += 1
+            batch.append(message_id)
+            if len(batch) == BATCH_SIZE:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+
+    async def _delete(self, batch: List[int]):
+        while True:
+            await self.rate.wait()
+            try:
+                deleted = await self.client.delete_messages(self.chat_id, batch)
+                self.deleted += deleted
+                self.rate.success()
+                return
+            except FloodWait as e:
+                self.rate.flood(e.value)
+            except (Forbidden, ChatAdminRequired) as e:
+                # no right to delete, every other batch would fail the same way
+                self.failed += len(batch)
+                self.error = e
+                self.task.cancel()
+                return
+            except Exception:
+                self.failed += len(batch)
+                return
+
+    async def _consume(self, queue: asyncio.Queue):
+        while (batch := await queue.get()) is not None:
+            await self._delete(batch)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            with contextlib.suppress(Exception):
+                await self.progress(self)
+
+    async def _run(self, source: AsyncIterator[int]):
+        # bounded, history is only read a few batches ahead of the deletions
+        queue: asyncio.Queue = asyncio.Queue(self.concurrency * 2)
+        workers = [
+            asyncio.create_task(self._consume(queue)) for _ in range(self.concurrency)
+        ]
+        reporter = asyncio.create_task(self._report()) if self.progress else None
+        try:
+            await self._produce(source, queue)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in [*workers, reporter]:
+                if task:
+                    task.cancel()
+
+    async def run(self, source: AsyncIterator[int]) -> "PruneJob":
+        """
+        Delete every id yielded by source, return once done or cancelled.
+        Raise the permission error that aborted the job, if any.
+        """
+        if self.chat_id in prune_jobs:
+            raise RuntimeError(f"A prune job is already running in {self.chat_id}")
+        prune_jobs[self.chat_id] = self
+        self.task = asyncio.create_task(self._run(source))
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            if self.error:
+                raise self.error
+            if not self.cancelled:
+                # the command itself was cancelled
+                self.task.cancel()
+                raise
+        finally:
+            if prune_jobs.get(self.chat_id) is self:
+                del prune_jobs[self.chat_id]
+        return self
+
+
+def is_pruning(chat_id: int) -> bool:
+    return chat_id in prune_jobs
+
+
+def cancel_prune(chat_id: int) -> bool:
+    if job := prune_jobs.get(chat_id):
+        job.cancel()
+        return True
+    return False
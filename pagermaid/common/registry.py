@@ -0,0 +1,236 @@
+import ast
+import contextlib
+import hashlib
+import importlib
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from pagermaid import bot, help_messages, all_permissions, hook_functions
+from pagermaid.common.router import command_router
+
+# listener arguments that can be stored in the lazy plugin manifest
+LAZY_LISTENER_KEYS = {
+    "command",
+    "description",
+    "parameters",
+    "priority",
+    "need_admin",
+    "is_plugin",
+    "incoming",
+    "outgoing",
+    "groups_only",
+    "privates_only",
+    "ignore_edited",
+    "ignore_reacted",
+    "ignore_forwarded",
+    "block_process",
+    "disallow_alias",
+    "allow_parent",
+    "diagnostics",
+}
+
+
+class ModuleRecord:
+    """Everything one module registered while it was being imported."""
+
+    __slots__ = ("handlers", "help", "permissions", "routes", "listeners", "eager")
+
+    def __init__(self):
+        self.handlers: List[Tuple] = []
+        self.help: List[str] = []
+        self.permissions: List = []
+        self.routes: List[Tuple[str, Optional[str]]] = []
+        # listener arguments, for lazy loading
+        self.listeners: List[Dict] = []
+        # registered something that can not be replayed from the manifest
+        self.eager = False
+
+
+class ModuleRegistry:
+    """
+    模块注册表：记录每个模块注册的处理器、帮助、权限与命令路由，
+    以便只卸载并重新导入发生变化的插件
+    """
+
+    def __init__(self):
+        self.records: Dict[str, ModuleRecord] = {}
+        # plugin name -> (mtime_ns, size, sha1)
+        self.fingerprints: Dict[str, Tuple[int, int, str]] = {}
+        self.current: Optional[str] = None
+        # command -> [(module, help entry)], the last one is shown, so removing
+        # a plugin that overrode a command brings the shadowed entry back
+        self.help_owners: Dict[str, List[Tuple[Optional[str], Dict]]] = {}
+        # (command, sub command) -> how many modules registered it
+        self.route_refs: Dict[Tuple[str, Optional[str]], int] = {}
+
+    @contextlib.contextmanager
+    def loading(self, module: str):
+        """Attribute registrations made during the import of `module`."""
+        self.current, previous = module, self.current
+        self.records[module] = ModuleRecord()
+        try:
+            yield
+        finally:
+            self.current = previous
+
+    def record(self) -> Optional[ModuleRecord]:
+        return self.records.get(self.current) if self.current else None
+
+    def import_module(self, name: str, reload: bool = False):
+        try:
+            with self.loading(name):
+                module = importlib.import_module(name)
+                if reload:
+                    importlib.reload(module)
+        except BaseException:
+            # drop whatever the module registered before failing
+            self.unregister(name)
+            raise
+        return module
+
+    def add_listener(self, args: Dict):
+        if not (record := self.record()):
+            return
+        if "command" in args and all(
+            key in LAZY_LISTENER_KEYS
+            and isinstance(value, (str, int, float, bool, type(None)))
+            for key, value in args.items()
+        ):
+            record.listeners.append(dict(args))
+        else:
+            record.eager = True
+
+    def mark_eager(self):
+        if record := self.record():
+            record.eager = True
+
+    def add_handler(self, handler, group: int):
+        if record := self.record():
+            record.handlers.append((handler, group))
+
+    def add_help(self, command: str, permission):
+        self.help_owners.setdefault(command, []).append(
+            (self.current, help_messages[command])
+        )
+        if record := self.record():
+            record.help.append(command)
+            record.permissions.append(permission)
+
+    def add_route(self, command: str, sub_command: Optional[str] = None):
+        route = (command.lower(), sub_command.lower() if sub_command else None)
+        self.route_refs[route] = self.route_refs.get(route, 0) + 1
+        if record := self.record():
+            record.routes.append((command, sub_command))
+
+    def remove_help(self, module: str, command: str):
+        owners = [i for i in self.help_owners.get(command, []) if i[0] != module]
+        if owners:
+            self.help_owners[command] = owners
+            help_messages[command] = owners[-1][1]
+        else:
+            self.help_owners.pop(command, None)
+            help_messages.pop(command, None)
+
+    def remove_route(self, command: str, sub_command: Optional[str] = None):
+        route = (command.lower(), sub_command.lower() if sub_command else None)
+        if (refs := self.route_refs.get(route, 0) - 1) > 0:
+            self.route_refs[route] = refs
+            return
+        self.route_refs.pop(route, None)
+        if sub_command:
+            command_router.unregister(*route)
+        elif not any(i[0] == route[0] for i in self.route_refs):
+            # keep the command while sub commands of other modules use it
+            command_router.unregister(route[0])
+
+    def unregister(self, module: str):
+        """Remove handlers, jobs, hooks, help, permissions and routes of a module."""
+        record = self.records.pop(module, ModuleRecord())
+        handlers = {id(handler): (handler, group) for handler, group in record.handlers}
+        # handlers added with bot.add_handler / bot.on_message directly
+        for group, group_handlers in bot.dispatcher.groups.items():
+            for handler in group_handlers:
+                if getattr(handler.callback, "__module__", None) == module:
+                    handlers[id(handler)] = (handler, group)
+        for handler, group in handlers.values():
+            bot.dispatcher.remove_handler(handler, group)
+        for job in bot.job.get_jobs():
+            if getattr(job.func, "__module__", None) == module:
+                job.remove()
+        for functions in hook_functions.values():
+            for function in [
+                i for i in functions if getattr(i, "__module__", None) == module
+            ]:
+                functions.discard(function)
+        for command in record.help:
+            self.remove_help(module, command)
+        for permission in record.permissions:
+            with contextlib.suppress(ValueError):
+                all_permissions.remove(permission)
+        for route in record.routes:
+            self.remove_route(*route)
+
+    def clear(self):
+        self.records.clear()
+        self.help_owners.clear()
+        self.route_refs.clear()
+        self.current = None
+
+    @staticmethod
+    def fingerprint(path: str) -> Tuple[int, int, str]:
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def update_fingerprint(self, name: str, path: str):
+        with contextlib.suppress(OSError):
+            self.fingerprints[name] = self.fingerprint(path)
+
+    def changed(self, name: str, path: str) -> bool:
+        old = self.fingerprints.get(name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return True
+        if old and old[:2] == (stat.st_mtime_ns, stat.st_size):
+            return False
+        # mtime changed, compare content before reloading
+        return not old or self.fingerprint(path)[2] != old[2]
+
+    @staticmethod
+    def plugin_imports(path: str) -> Set[str]:
+        """Names of the plugins imported by a plugin file."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            return set()
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                modules = [node.module]
+                if node.module == "plugins":
+                    modules = [f"plugins.{alias.name}" for alias in node.names]
+            else:
+                continue
+            names.update(i.split(".")[1] for i in modules if i.startswith("plugins."))
+        return names
+
+    def dependents(self, names: Set[str], paths: Dict[str, str]) -> Set[str]:
+        """Plugins that (transitively) import any of `names`."""
+        imports = {name: self.plugin_imports(path) for name, path in paths.items()}
+        result, pending = set(names), set(names)
+        while pending:
+            pending = {
+                name
+                for name, deps in imports.items()
+                if name not in result and deps & pending
+            }
+            result |= pending
+        return result
+
+
+module_registry = ModuleRegistry()
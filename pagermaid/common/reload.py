@@ -1,6 +1,7 @@
 import contextlib
 import importlib
 import os
+import sys
 
 import pagermaid.config
 import pagermaid.modules
@@ -12,14 +13,46 @@ from pagermaid import (
     hook_functions,
     logs,
 )
+from pagermaid.common.dialogs import dialog_index
+from pagermaid.common.lazy import lazy_plugin_manager
 from pagermaid.common.plugin import plugin_manager
+from pagermaid.common.profiler import startup_profiler
+from pagermaid.common.registry import module_registry
+from pagermaid.common.router import command_router
 from pagermaid.hook import Hook
+from pagermaid.single_utils import sqlite_cache
 from pagermaid.utils import lang
 
 
+def plugin_path(plugin_name: str) -> str:
+    return os.path.join("plugins", f"{plugin_name}.py")
+
+
+def load_plugin(plugin_name: str, reload: bool = False) -> bool:
+    """
+    Import a plugin, or only register its commands when it can be lazy loaded.
+    Return whether the import was deferred.
+    """
+    path = plugin_path(plugin_name)
+    lazy_plugin_manager.discard(plugin_name)
+    entry = None
+    if pagermaid.config.Config.LAZY_PLUGINS and not reload:
+        entry = lazy_plugin_manager.get_entry(plugin_name, path)
+    if entry:
+        lazy_plugin_manager.register(plugin_name, entry)
+    else:
+        module_registry.import_module(f"plugins.{plugin_name}", reload=reload)
+        if pagermaid.config.Config.LAZY_PLUGINS:
+            lazy_plugin_manager.update(plugin_name, path)
+    module_registry.update_fingerprint(plugin_name, path)
+    return bool(entry)
+
+
 async def reload_all():
     read_context.clear()
+    sqlite_cache.clear()
     bot.dispatcher.remove_all_handlers()
+    dialog_index.attach(bot)
     bot.job.remove_all_jobs()
     with contextlib.suppress(RuntimeError):
         bot.cancel_all_listener()
@@ -30,45 +63,91 @@ async def reload_all():
     importlib.reload(pagermaid.modules)
     help_messages.clear()
     all_permissions.clear()
+    command_router.clear()
+    module_registry.clear()
     for functions in hook_functions.values():
         functions.clear()  # noqa: clear all hooks
 
     for module_name in pagermaid.modules.module_list:
         try:
-            module = importlib.import_module(f"pagermaid.modules.{module_name}")
-            if module_name in loaded_plugins:
-                importlib.reload(module)
+            module_registry.import_module(
+                f"pagermaid.modules.{module_name}",
+                reload=module_name in loaded_plugins,
+            )
         except BaseException as exception:
             logs.info(
                 f"{lang('module')} {module_name} {lang('error')}: {type(exception)}: {exception}"
             )
     for plugin_name in pagermaid.modules.plugin_list.copy():
         try:
-            plugin = importlib.import_module(f"plugins.{plugin_name}")
-            if plugin_name in loaded_plugins and os.path.exists(plugin.__file__):
-                importlib.reload(plugin)
+            load_plugin(
+                plugin_name,
+                reload=plugin_name in loaded_plugins
+                and f"plugins.{plugin_name}" in sys.modules,
+            )
         except BaseException as exception:
             logs.info(f"{lang('module')} {plugin_name} {lang('error')}: {exception}")
             pagermaid.modules.plugin_list.remove(plugin_name)
+    lazy_plugin_manager.save()
     plugin_manager.load_local_plugins()
     plugin_manager.save_local_version_map()
     await Hook.load_success_exec()
 
 
+async def reload_plugins():
+    """
+    Re-import only the plugins whose files changed (and the plugins importing
+    them), keeping every other handler, job, hook and conversation in place.
+    """
+    loaded_plugins = set(pagermaid.modules.plugin_list)
+    importlib.reload(pagermaid.modules)
+    current_plugins = set(pagermaid.modules.plugin_list)
+    paths = {name: plugin_path(name) for name in current_plugins}
+    removed = loaded_plugins - current_plugins
+    added = current_plugins - loaded_plugins
+    changed = {
+        name
+        for name in current_plugins & loaded_plugins
+        if module_registry.changed(name, paths[name])
+    }
+    affected = module_registry.dependents(changed | removed, paths) - removed
+    for plugin_name in removed | affected:
+        module_registry.unregister(f"plugins.{plugin_name}")
+    for plugin_name in removed:
+        sys.modules.pop(f"plugins.{plugin_name}", None)
+        lazy_plugin_manager.discard(plugin_name)
+        module_registry.fingerprints.pop(plugin_name, None)
+    for plugin_name in sorted(affected | added):
+        try:
+            load_plugin(plugin_name, reload=f"plugins.{plugin_name}" in sys.modules)
+        except BaseException as exception:
+            logs.info(f"{lang('module')} {plugin_name} {lang('error')}: {exception}")
+            pagermaid.modules.plugin_list.remove(plugin_name)
+    lazy_plugin_manager.save()
+    plugin_manager.load_local_plugins()
+    plugin_manager.save_local_version_map()
+    if removed or affected or added:
+        await Hook.load_success_exec()
+
+
 async def load_all():
+    dialog_index.attach(bot)
     for module_name in pagermaid.modules.module_list.copy():
         try:
-            importlib.import_module(f"pagermaid.modules.{module_name}")
+            with startup_profiler.measure(module_name, "module"):
+                module_registry.import_module(f"pagermaid.modules.{module_name}")
         except BaseException as exception:
             logs.info(
                 f"{lang('module')} {module_name} {lang('error')}: {type(exception)}: {exception}"
             )
     for plugin_name in pagermaid.modules.plugin_list.copy():
         try:
-            importlib.import_module(f"plugins.{plugin_name}")
+            with startup_profiler.measure(plugin_name, "plugin") as record:
+                record.lazy = load_plugin(plugin_name)
         except BaseException as exception:
             logs.info(f"{lang('module')} {plugin_name} {lang('error')}: {exception}")
             pagermaid.modules.plugin_list.remove(plugin_name)
+    lazy_plugin_manager.save()
     plugin_manager.load_local_plugins()
     await Hook.load_success_exec()
     await Hook.startup()
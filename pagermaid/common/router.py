@@ -0,0 +1,96 @@
+from typing import Dict, Optional, Set
+
+from pyrogram import filters
+
+from pagermaid.single_utils import Message
+
+COMMAND_PREFIXES = (",", "，")
+SUDO_PREFIXES = ("/",)
+
+
+class ParsedCommand:
+    __slots__ = ("prefix", "command", "sub_command", "arguments", "sub_arguments")
+
+    def __init__(
+        self,
+        prefix: str,
+        command: str,
+        sub_command: Optional[str],
+        arguments: str,
+        sub_arguments: Optional[str],
+    ):
+        self.prefix = prefix
+        self.command = command
+        self.sub_command = sub_command
+        self.arguments = arguments
+        self.sub_arguments = sub_arguments
+
+
+class CommandRouter:
+    """
+    命令路由表：每条消息只解析一次前缀与命令，之后通过字典查找匹配命令与子命令
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, Set[str]] = {}
+
+    def register(self, command: str, sub_command: Optional[str] = None) -> None:
+        subs = self.commands.setdefault(command.lower(), set())
+        if sub_command:
+            subs.add(sub_command.lower())
+
+    def unregister(self, command: str, sub_command: Optional[str] = None) -> None:
+        command = command.lower()
+        if sub_command:
+            self.commands.get(command, set()).discard(sub_command.lower())
+        else:
+            self.commands.pop(command, None)
+
+    def clear(self) -> None:
+        self.commands.clear()
+
+    def parse_text(self, text: Optional[str]) -> Optional[ParsedCommand]:
+        if not text or (
+            text[0] not in COMMAND_PREFIXES and text[0] not in SUDO_PREFIXES
+        ):
+            return None
+        head, _, arguments = text[1:].partition(" ")
+        command = head.lower()
+        if (subs := self.commands.get(command)) is None:
+            return None
+        sub_command, sub_arguments = None, None
+        if subs:
+            sub_head, _, rest = arguments.partition(" ")
+            if sub_head.lower() in subs:
+                sub_command, sub_arguments = sub_head.lower(), rest
+        return ParsedCommand(text[0], command, sub_command, arguments, sub_arguments)
+
+    def parse(self, message: Message) -> Optional[ParsedCommand]:
+        """解析结果缓存在消息对象上，同一条消息的所有处理器共享"""
+        try:
+            return message._pgp_parsed_command  # noqa
+        except AttributeError:
+            pass
+        parsed = self.parse_text(message.text or message.caption)
+        message._pgp_parsed_command = parsed
+        return parsed
+
+
+command_router = CommandRouter()
+
+
+def command_filter(command: str, sub_command: Optional[str] = None, sudo: bool = False):
+    async def if_command(flt, _, message: Message):
+        parsed = command_router.parse(message)
+        if parsed is None or parsed.prefix not in flt.prefixes:
+            return False
+        if parsed.command != flt.command:
+            return False
+        return flt.sub_command is None or parsed.sub_command == flt.sub_command
+
+    return filters.create(
+        if_command,
+        command=command.lower(),
+        sub_command=sub_command.lower() if sub_command else None,
+        prefixes=SUDO_PREFIXES if sudo else COMMAND_PREFIXES,
+    )
@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 import psutil
 from pydantic import BaseModel
 from pagermaid import start_time, Config, pgm_version
+from pagermaid.common.watchdog import loop_watchdog
 
 
 class Status(BaseModel):
@@ -12,6 +13,8 @@ class Status(BaseModel):
     cpu_percent: str
     ram_percent: str
     swap_percent: str
+    loop_lag: str
+    loop_blocks: int
 
 
 async def human_time_duration(seconds) -> str:
@@ -51,4 +54,6 @@ async def get_status() -> Status:
         cpu_percent=f"{cpu_percent}%",
         ram_percent=f"{ram_stat.percent}%",
         swap_percent=f"{swap_stat.percent}%",
+        loop_lag=f"{loop_watchdog.avg_lag * 1000:.1f}ms / {loop_watchdog.max_lag * 1000:.1f}ms",
+        loop_blocks=loop_watchdog.blocks,
     )
@@ -0,0 +1,146 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from os import sep
+from typing import Deque, Dict, Optional
+
+from pagermaid import logs
+from pagermaid.common.metrics import Histogram, command_metrics
+from pagermaid.config import Config
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class BlockReport:
+    """One stall of the event loop, captured by the watchdog thread."""
+
+    __slots__ = ("time", "duration", "command", "location", "stack")
+
+    def __init__(self, command: Optional[str], location: Optional[str], stack: str):
+        self.time = time.time()
+        self.duration = 0.0
+        self.command = command
+        self.location = location
+        self.stack = stack
+
+    def dict(self) -> Dict:
+        return {
+            "time": self.time,
+            "duration": round(self.duration, 3),
+            "command": self.command,
+            "location": self.location,
+            "stack": self.stack,
+        }
+
+
+class LoopWatchdog:
+    """
+    Measure the event loop lag with a heartbeat task, and let a thread capture
+    the stack of the loop thread whenever the heartbeat stops for too long.
+    """
+
+    def __init__(
+        self, interval: float = 0.5, threshold: float = 1.0, max_reports: int = 20
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram(LAG_BUCKETS)
+        self.max_lag = 0.0
+        self.reports: Deque[BlockReport] = deque(maxlen=max_reports)
+        self.blocks = 0
+        self.heartbeat = time.perf_counter()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        if self.task or Config.WATCHDOG_THRESHOLD <= 0:
+            return
+        self.threshold = Config.WATCHDOG_THRESHOLD
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.perf_counter()
+        self.stopped.clear()
+        self.task = asyncio.create_task(self.beat())
+        self.thread = threading.Thread(
+            target=self.watch, name="pagermaid-watchdog", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def beat(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - start - self.interval, 0.0)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self.heartbeat = now
+
+    def watch(self):
+        report: Optional[BlockReport] = None
+        heartbeat = self.heartbeat
+        while not self.stopped.wait(self.interval / 2):
+            blocked = time.perf_counter() - self.heartbeat - self.interval
+            if blocked < self.threshold:
+                if report:
+                    report.duration = self.heartbeat - heartbeat - self.interval
+                    logs.warning(
+                        f"Event loop was blocked for {report.duration:.2f}s "
+                        f"by {report.command or report.location or 'unknown'}"
+                    )
+                    report = None
+                heartbeat = self.heartbeat
+                continue
+            if report is None:
+                report = self.capture()
+                report.duration = blocked
+                self.blocks += 1
+                self.reports.append(report)
+                logs.warning(
+                    f"Event loop blocked for more than {self.threshold}s by "
+                    f"{report.command or report.location or 'unknown'}:\n{report.stack}"
+                )
+            else:
+                report.duration = blocked
+
+    def capture(self) -> BlockReport:
+        # only the frames are read, asyncio state belongs to the loop thread
+        frame = sys._current_frames().get(self.loop_thread_id)  # noqa
+        stack = "".join(traceback.format_stack(frame, limit=15)) if frame else ""
+        command, location = None, None
+        while frame is not None and command is None:
+            filename = frame.f_code.co_filename
+            if location is None and (
+                f"{sep}plugins{sep}" in filename or f"{sep}modules{sep}" in filename
+            ):
+                location = f"{filename}:{frame.f_lineno}"
+            command = command_metrics.running.get(frame)
+            frame = frame.f_back
+        return BlockReport(command, location, stack)
+
+    def dict(self) -> Dict:
+        return {
+            "lag": self.lag.dict(),
+            "max_lag": round(self.max_lag, 6),
+            "blocks": self.blocks,
+            "reports": [i.dict() for i in reversed(self.reports)],
+        }
+
+    @property
+    def avg_lag(self) -> float:
+        return self.lag.sum / self.lag.count if self.lag.count else 0.0
+
+
+loop_watchdog = LoopWatchdog()
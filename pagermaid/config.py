@@ -145,7 +145,71 @@ class Config:
         WEB_HOST = os.environ.get("WEB_HOST", web_interface.get("host", "127.0.0.1"))
         WEB_PORT = int(os.environ.get("WEB_PORT", web_interface.get("port", 3333)))
         WEB_ORIGINS = web_interface.get("origins", ["*"])
+        http_client = config.get("http_client", {})
+        HTTP_TIMEOUT = float(
+            os.environ.get("PGM_HTTP_TIMEOUT", http_client.get("timeout", 10))
+        )
+        HTTP_MAX_CONNECTIONS = int(
+            os.environ.get(
+                "PGM_HTTP_MAX_CONNECTIONS", http_client.get("max_connections", 100)
+            )
+        )
+        HTTP_MAX_KEEPALIVE = int(
+            os.environ.get(
+                "PGM_HTTP_MAX_KEEPALIVE", http_client.get("max_keepalive", 20)
+            )
+        )
+        HTTP_KEEPALIVE_EXPIRY = float(
+            os.environ.get(
+                "PGM_HTTP_KEEPALIVE_EXPIRY", http_client.get("keepalive_expiry", 30)
+            )
+        )
+        HTTP_PER_HOST = int(
+            os.environ.get("PGM_HTTP_PER_HOST", http_client.get("per_host", 10))
+        )
+        HTTP_HTTP2 = strtobool(
+            os.environ.get("PGM_HTTP_HTTP2", http_client.get("http2", "False"))
+        )
+        HTTP_RETRIES = int(
+            os.environ.get("PGM_HTTP_RETRIES", http_client.get("retries", 2))
+        )
+        HTTP_BACKOFF = float(
+            os.environ.get("PGM_HTTP_BACKOFF", http_client.get("backoff", 0.5))
+        )
         USE_PB = strtobool(os.environ.get("PGM_USE_PB", config.get("use_pb")), True)
+        HOOK_TIMEOUT = float(
+            os.environ.get("PGM_HOOK_TIMEOUT", config.get("hook_timeout", 30))
+        )
+        HOOK_DETACH = strtobool(
+            os.environ.get("PGM_HOOK_DETACH", config.get("hook_detach")), True
+        )
+        WATCHDOG_THRESHOLD = float(
+            os.environ.get(
+                "PGM_WATCHDOG_THRESHOLD", config.get("watchdog_threshold", 1)
+            )
+        )
+        EXECUTOR_THREADS = int(
+            os.environ.get("PGM_EXECUTOR_THREADS", config.get("executor_threads", 0))
+        )
+        EXECUTOR_PROCESSES = int(
+            os.environ.get(
+                "PGM_EXECUTOR_PROCESSES", config.get("executor_processes", 0)
+            )
+        )
+        LAZY_PLUGINS = strtobool(
+            os.environ.get("PGM_LAZY_PLUGINS", config.get("lazy_plugins")), False
+        )
+        BACKUP_COMPRESSION = os.environ.get(
+            "PGM_BACKUP_COMPRESSION", config.get("backup_compression", "gzip")
+        )
+        BACKUP_CHUNK_SIZE = int(
+            os.environ.get(
+                "PGM_BACKUP_CHUNK_SIZE", config.get("backup_chunk_size", 1900)
+            )
+        )
+        BACKUP_MAX_DELTAS = int(
+            os.environ.get("PGM_BACKUP_MAX_DELTAS", config.get("backup_max_deltas", 10))
+        )
     except ValueError as e:
         print(e)
         sys.exit(1)
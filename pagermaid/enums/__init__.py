@@ -1,6 +1,7 @@
 from pagermaid.single_utils import Client
 from pagermaid.single_utils import Message
 from pagermaid.sub_utils import Sub
+from pagermaid.common.executor import ExecutorManager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlitedict import SqliteDict
 from httpx import AsyncClient
@@ -14,4 +15,5 @@ __all__ = [
     "SqliteDict",
     "AsyncClient",
     "Logger",
+    "ExecutorManager",
 ]
@@ -1,6 +1,6 @@
 from typing import NewType, Callable, Any, Awaitable, Union, TYPE_CHECKING, Optional
 
-from ..inject import inject
+from ..inject import get_inject_plan, inject_by_plan
 
 if TYPE_CHECKING:
     from . import Client, Message
@@ -17,6 +17,7 @@ class CommandHandler:
         self._pgp_func__: CommandHandlerFunc = func
         self._pgp_command__: Optional[str] = command
         self._pgp_raw_handler = None
+        self._pgp_inject_plan = get_inject_plan(func)
 
     def func(self) -> CommandHandlerFunc:
         return self._pgp_func__
@@ -32,7 +33,7 @@ class CommandHandler:
 
     async def handler(self, client: "Client", message: "Message"):
         func = self.func()
-        if data := inject(message, func):
+        if data := inject_by_plan(self._pgp_inject_plan, message):
             await func(**data)
         else:
             if func.__code__.co_argcount == 0:
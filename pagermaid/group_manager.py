@@ -1,10 +1,12 @@
 import casbin
+import contextlib
+from casbin.persist.adapters import FileAdapter
 from logging import CRITICAL
 from shutil import copyfile
 from os import path as os_path
 from re import findall
-from os import sep
-from typing import List
+from os import fsync, sep, replace
+from typing import Dict, Iterable, List, Tuple
 from pagermaid import all_permissions, module_dir
 
 # init permissions
@@ -17,6 +19,10 @@ permissions = casbin.Enforcer(
     f"pagermaid{sep}assets{sep}gm_model.conf", f"data{sep}gm_policy.csv"
 )
 permissions.logger.setLevel(CRITICAL)
+policy_path = f"data{sep}gm_policy.csv"
+# nesting depth of policy_batch() and whether a save was deferred inside it
+_batch_depth = 0
+_batch_dirty = False
 
 
 class Permission:
@@ -28,20 +34,78 @@ class Permission:
         self.act: str = "access" if self.enable else "ejection"
 
 
-def enforce_permission(user: int, permission: str):
+# (user, permission) -> decision, cleared whenever the policy changes
+decision_cache: Dict[Tuple[str, str], bool] = {}
+
+
+def clear_decision_cache():
+    decision_cache.clear()
+
+
+def _enforce_permission(user: str, permission: str) -> bool:
     data = permission.split(".")
     if len(data) != 2:
         raise ValueError("Invalid permission format")
-    if permissions.enforce(str(user), data[0], "access") and not permissions.enforce(
-        str(user), permission, "ejection"
+    if permissions.enforce(user, data[0], "access") and not permissions.enforce(
+        user, permission, "ejection"
     ):
         return True
     return bool(
-        permissions.enforce(str(user), permission, "access")
-        and not permissions.enforce(str(user), permission, "ejection")
+        permissions.enforce(user, permission, "access")
+        and not permissions.enforce(user, permission, "ejection")
     )
 
 
+def enforce_permission(user: int, permission: str) -> bool:
+    key = (str(user), permission)
+    if key not in decision_cache:
+        decision_cache[key] = _enforce_permission(key[0], permission)
+    return decision_cache[key]
+
+
+def _write_policy():
+    """Write the policy to a temp file, flush it to disk, then swap it in."""
+    temp_path = f"{policy_path}.tmp"
+    open(temp_path, "w", encoding="utf-8").close()
+    FileAdapter(temp_path).save_policy(permissions.get_model())
+    with open(temp_path, "rb") as f:
+        fsync(f.fileno())
+    replace(temp_path, policy_path)
+
+
+def save_policy():
+    global _batch_dirty
+    clear_decision_cache()
+    if _batch_depth:
+        _batch_dirty = True
+        return
+    _write_policy()
+
+
+@contextlib.contextmanager
+def policy_batch():
+    """
+    Apply many policy changes and persist them once on exit.
+
+    with policy_batch():
+        add_user_to_group("1", "default")
+        add_permission_for_user("1", Permission("modules.*"))
+    """
+    global _batch_depth, _batch_dirty
+    _batch_depth += 1
+    try:
+        yield permissions
+    finally:
+        _batch_depth -= 1
+        if not _batch_depth and _batch_dirty:
+            _batch_dirty = False
+            _write_policy()
+
+
+def enforce_many(user: int, permission_list: Iterable[str]) -> List[bool]:
+    return [enforce_permission(user, permission) for permission in permission_list]
+
+
 def parse_pen(pen: Permission) -> List[Permission]:
     if pen.name.count("*") != 1:
         raise ValueError("Invalid permission format")
@@ -63,38 +127,38 @@ def parse_pen(pen: Permission) -> List[Permission]:
 def add_user_to_group(user: str, group: str):
     if group not in permissions.get_roles_for_user(user):
         permissions.add_role_for_user(user, group)
-        permissions.save_policy()
+        save_policy()
 
 
 def remove_user_from_group(user: str, group: str):
     if group in permissions.get_roles_for_user(user):
         permissions.delete_role_for_user(user, group)
-        permissions.save_policy()
+        save_policy()
 
 
 def add_permission_for_group(group: str, permission: Permission):
     data = parse_pen(permission) if "*" in permission.name else [permission]
     for i in data:
         permissions.add_policy(group, i.name, permission.act, "allow")
-    permissions.save_policy()
+    save_policy()
 
 
 def remove_permission_for_group(group: str, permission: Permission):
     data = parse_pen(permission) if "*" in permission.name else [permission]
     for i in data:
         permissions.remove_policy(group, i.name, permission.act, "allow")
-    permissions.save_policy()
+    save_policy()
 
 
 def add_permission_for_user(user: str, permission: Permission):
     data = parse_pen(permission) if "*" in permission.name else [permission]
     for i in data:
         permissions.add_permission_for_user(user, i.name, permission.act, "allow")
-    permissions.save_policy()
+    save_policy()
 
 
 def remove_permission_for_user(user: str, permission: Permission):
     data = parse_pen(permission) if "*" in permission.name else [permission]
     for i in data:
         permissions.delete_permission_for_user(user, i.name, permission.act, "allow")
-    permissions.save_policy()
+    save_policy()
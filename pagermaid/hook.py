@@ -1,12 +1,123 @@
 import asyncio
+import contextlib
 import sys
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
 
 from pyrogram import StopPropagation
 
 from pagermaid import hook_functions, logs
-from pagermaid.inject import inject
+from pagermaid.common.metrics import Histogram
+from pagermaid.config import Config
+from pagermaid.inject import inject, get_inject_plan
 from pagermaid.single_utils import Message
 
+hook_latency: Dict[str, Histogram] = {}
+hook_timeouts: Dict[str, int] = {}
+
+
+def get_hook_name(kind: str, function) -> str:
+    module = getattr(function, "__module__", "")
+    return f"{kind}:{module}.{getattr(function, '__qualname__', function)}"
+
+
+def set_hook_timeout(function, timeout: Optional[float]):
+    if timeout is not None:
+        with contextlib.suppress(AttributeError):
+            function.__pgp_hook_timeout__ = timeout
+
+
+async def run_hook(kind: str, function, data: Dict):
+    """Run one hook with its own timeout and record its latency."""
+    name = get_hook_name(kind, function)
+    timeout = getattr(function, "__pgp_hook_timeout__", None) or Config.HOOK_TIMEOUT
+    start = perf_counter()
+    try:
+        await asyncio.wait_for(function(**data), timeout)
+    except asyncio.TimeoutError:
+        hook_timeouts[name] = hook_timeouts.get(name, 0) + 1
+        logs.warning(f"[{kind}]: {name} timed out after {timeout}s")
+    finally:
+        if name not in hook_latency:
+            hook_latency[name] = Histogram()
+        hook_latency[name].observe(perf_counter() - start)
+
+
+class HookQueue:
+    """Bounded background queue, runs hooks off the command path."""
+
+    def __init__(self, max_size: int = 256, workers: int = 2):
+        self.max_size = max_size
+        self.workers = workers
+        self.dropped = 0
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self.queue = asyncio.Queue(self.max_size)
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    def submit(self, kind: str, function, data: Dict) -> bool:
+        if self.queue is None:
+            self.start()
+        try:
+            self.queue.put_nowait((kind, function, data))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logs.debug(f"[{kind}]: hook queue is full, dropped {function}")
+            return False
+
+    async def worker(self):
+        while True:
+            kind, function, data = await self.queue.get()
+            try:
+                await run_hook(kind, function, data)
+            except SystemExit:
+                await Hook.shutdown()
+                sys.exit(0)
+            except StopPropagation:
+                pass
+            except Exception as exception:
+                logs.info(f"[{kind}]: {type(exception)}: {exception}")
+            finally:
+                self.queue.task_done()
+
+    async def stop(self, timeout: float = 5.0):
+        """Wait for queued hooks to finish, then stop the workers."""
+        if self.queue is None:
+            return
+        if asyncio.current_task() not in self.tasks:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.queue.join(), timeout)
+        for task in self.tasks:
+            task.cancel()
+        self.queue, self.tasks = None, []
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "dropped": self.dropped,
+            "timeouts": dict(hook_timeouts),
+            "latency": {name: data.dict() for name, data in hook_latency.items()},
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            "# HELP pagermaid_hook_queue_size Hooks waiting in the background queue.",
+            "# TYPE pagermaid_hook_queue_size gauge",
+            f"pagermaid_hook_queue_size {self.queue.qsize() if self.queue else 0}",
+            "# HELP pagermaid_hook_queue_capacity Hooks the background queue can hold.",
+            "# TYPE pagermaid_hook_queue_capacity gauge",
+            f"pagermaid_hook_queue_capacity {self.max_size}",
+            "# HELP pagermaid_hook_dropped_total Hooks dropped because the queue was full.",
+            "# TYPE pagermaid_hook_dropped_total counter",
+            f"pagermaid_hook_dropped_total {self.dropped}",
+        ]
+
+
+hook_queue = HookQueue()
+
 
 class Hook:
     @staticmethod
@@ -16,6 +127,7 @@ class Hook:
         """
 
         def decorator(function):
+            get_inject_plan(function)
             hook_functions["startup"].add(function)
             return function
 
@@ -28,42 +140,49 @@ class Hook:
         """
 
         def decorator(function):
+            get_inject_plan(function)
             hook_functions["shutdown"].add(function)
             return function
 
         return decorator
 
     @staticmethod
-    def command_preprocessor():
+    def command_preprocessor(timeout: Optional[float] = None):
         """
         注册一个命令预处理钩子
         """
 
         def decorator(function):
+            get_inject_plan(function)
+            set_hook_timeout(function, timeout)
             hook_functions["command_pre"].add(function)
             return function
 
         return decorator
 
     @staticmethod
-    def command_postprocessor():
+    def command_postprocessor(timeout: Optional[float] = None):
         """
         注册一个命令后处理钩子
         """
 
         def decorator(function):
+            get_inject_plan(function)
+            set_hook_timeout(function, timeout)
             hook_functions["command_post"].add(function)
             return function
 
         return decorator
 
     @staticmethod
-    def process_error():
+    def process_error(timeout: Optional[float] = None):
         """
         注册一个错误处理钩子
         """
 
         def decorator(function):
+            get_inject_plan(function)
+            set_hook_timeout(function, timeout)
             hook_functions["process_error"].add(function)
             return function
 
@@ -76,6 +195,7 @@ class Hook:
         """
 
         def decorator(function):
+            get_inject_plan(function)
             hook_functions["load_plugins_finished"].add(function)
             return function
 
@@ -93,6 +213,7 @@ class Hook:
 
     @staticmethod
     async def shutdown():
+        await hook_queue.stop()
         if cors := [
             shutdown(**inject(None, shutdown))
             for shutdown in hook_functions["shutdown"]
@@ -103,79 +224,68 @@ class Hook:
                 logs.info(f"[shutdown]: {type(exception)}: {exception}")
 
     @staticmethod
-    async def command_pre(message: Message, command, sub_command):
-        cors = []
+    def collect(kind: str, message: Optional[Message], **kwargs) -> List[Tuple]:
+        hooks = []
+        for function in hook_functions[kind]:
+            try:
+                data = inject(message, function, **kwargs)
+            except Exception as exception:
+                logs.info(f"[{kind}]: {type(exception)}: {exception}")
+                continue
+            hooks.append((function, data))
+        return hooks
+
+    @staticmethod
+    async def execute(kind: str, hooks: List[Tuple], detach: bool = False):
+        if detach:
+            for function, data in hooks:
+                hook_queue.submit(kind, function, data)
+            return
         try:
-            for pre in hook_functions["command_pre"]:
-                try:
-                    data = inject(
-                        message, pre, command=command, sub_command=sub_command
-                    )
-                except Exception as exception:
-                    logs.info(f"[process_error]: {type(exception)}: {exception}")
-                    continue
-                cors.append(pre(**data))  # noqa
-            if cors:
-                await asyncio.gather(*cors)
+            if hooks:
+                await asyncio.gather(
+                    *[run_hook(kind, function, data) for function, data in hooks]
+                )
         except SystemExit:
             await Hook.shutdown()
             sys.exit(0)
         except StopPropagation as e:
             raise StopPropagation from e
         except Exception as exception:
-            logs.info(f"[command_pre]: {type(exception)}: {exception}")
+            logs.info(f"[{kind}]: {type(exception)}: {exception}")
+
+    @staticmethod
+    async def command_pre(message: Message, command, sub_command):
+        if not hook_functions["command_pre"]:
+            return
+        hooks = Hook.collect(
+            "command_pre", message, command=command, sub_command=sub_command
+        )
+        await Hook.execute("command_pre", hooks)
 
     @staticmethod
     async def command_post(message: Message, command, sub_command):
-        cors = []
-        try:
-            for post in hook_functions["command_post"]:
-                try:
-                    data = inject(
-                        message, post, command=command, sub_command=sub_command
-                    )
-                except Exception as exception:
-                    logs.info(f"[process_error]: {type(exception)}: {exception}")
-                    continue
-                cors.append(post(**data))  # noqa
-            if cors:
-                await asyncio.gather(*cors)
-        except SystemExit:
-            await Hook.shutdown()
-            sys.exit(0)
-        except StopPropagation as e:
-            raise StopPropagation from e
-        except Exception as exception:
-            logs.info(f"[command_post]: {type(exception)}: {exception}")
+        if not hook_functions["command_post"]:
+            return
+        hooks = Hook.collect(
+            "command_post", message, command=command, sub_command=sub_command
+        )
+        await Hook.execute("command_post", hooks, detach=Config.HOOK_DETACH)
 
     @staticmethod
     async def process_error_exec(
         message: Message, command, exc_info: BaseException, exc_format: str
     ):
-        cors = []
-        try:
-            for error in hook_functions["process_error"]:
-                try:
-                    data = inject(
-                        message,
-                        error,
-                        command=command,
-                        exc_info=exc_info,
-                        exc_format=exc_format,
-                    )
-                except Exception as exception:
-                    logs.info(f"[process_error]: {type(exception)}: {exception}")
-                    continue
-                cors.append(error(**data))  # noqa
-            if cors:
-                await asyncio.gather(*cors)
-        except SystemExit:
-            await Hook.shutdown()
-            sys.exit(0)
-        except StopPropagation as e:
-            raise StopPropagation from e
-        except Exception as exception:
-            logs.info(f"[process_error]: {type(exception)}: {exception}")
+        if not hook_functions["process_error"]:
+            return
+        hooks = Hook.collect(
+            "process_error",
+            message,
+            command=command,
+            exc_info=exc_info,
+            exc_format=exc_format,
+        )
+        await Hook.execute("process_error", hooks, detach=Config.HOOK_DETACH)
 
     @staticmethod
     async def load_success_exec():
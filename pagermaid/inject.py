@@ -1,21 +1,61 @@
+import contextlib
 import inspect
 import pagermaid.enums as enums
 import pagermaid.services as services
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
+# (parameter name, provider), provider is None for the message itself,
+# otherwise the name looked up in services
+InjectPlan = List[Tuple[str, Optional[str]]]
 
-def inject(message: enums.Message, function, **data) -> Optional[Dict]:
+
+def build_inject_plan(function) -> Optional[InjectPlan]:
     try:
         signature = inspect.signature(function)
     except Exception:
         return None
+    plan = []
     for parameter_name, parameter in signature.parameters.items():
-        class_name = parameter.annotation.__name__
-        param = message if class_name == "Message" else services.get(class_name)
-        if not param:
-            if parameter_name == "message":
-                param = message
-            else:
-                param = services.get(parameter_name.capitalize())
-        data.setdefault(parameter_name, param)
+        annotation = parameter.annotation
+        class_name = getattr(
+            annotation, "__name__", annotation if isinstance(annotation, str) else ""
+        )
+        if class_name == "Message":
+            provider = None
+        elif services.get(class_name):
+            provider = class_name
+        elif parameter_name == "message":
+            provider = None
+        else:
+            provider = parameter_name.capitalize()
+        plan.append((parameter_name, provider))
+    return plan
+
+
+def get_inject_plan(function) -> Optional[InjectPlan]:
+    """Build the plan once and cache it on the function object."""
+    try:
+        return function.__pgp_inject_plan__
+    except AttributeError:
+        pass
+    plan = build_inject_plan(function)
+    with contextlib.suppress(AttributeError, TypeError):
+        function.__pgp_inject_plan__ = plan
+    return plan
+
+
+def inject_by_plan(
+    plan: Optional[InjectPlan], message: enums.Message, **data
+) -> Optional[Dict]:
+    if plan is None:
+        return None
+    for parameter_name, provider in plan:
+        if parameter_name not in data:
+            data[parameter_name] = (
+                message if provider is None else services.get(provider)
+            )
     return data
+
+
+def inject(message: enums.Message, function, **data) -> Optional[Dict]:
+    return inject_by_plan(get_inject_plan(function), message, **data)
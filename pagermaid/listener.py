@@ -1,7 +1,6 @@
-import asyncio
 import contextlib
 import sys
-from time import strftime, gmtime, time
+from time import strftime, gmtime, time, perf_counter
 from traceback import format_exc
 
 from pyrogram import ContinuePropagation, StopPropagation, filters, Client
@@ -17,6 +16,9 @@ from pyrogram.handlers import MessageHandler, EditedMessageHandler
 
 from pagermaid import help_messages, logs, Config, bot, read_context, all_permissions
 from pagermaid.common.ignore import ignore_groups_manager
+from pagermaid.common.metrics import command_metrics
+from pagermaid.common.registry import module_registry
+from pagermaid.common.router import command_router, command_filter
 from pagermaid.enums.command import CommandHandler, CommandHandlerDecorator
 from pagermaid.group_manager import Permission
 from pagermaid.single_utils import (
@@ -38,11 +40,10 @@ from pagermaid.hook import Hook
 from pagermaid.web import web
 from pyromod.utils import mod_filters
 
-_lock = asyncio.Lock()
-
 
 def listener(**args) -> CommandHandlerDecorator:
     """Register an event listener."""
+    module_registry.add_listener(args)
     parent_command = args.get("__parent_command")
     command = args.get("command")
     allow_parent = args.get("allow_parent", False)
@@ -50,7 +51,7 @@ def listener(**args) -> CommandHandlerDecorator:
     need_admin = args.get("need_admin", False)
     description = args.get("description")
     parameters = args.get("parameters")
-    pattern = sudo_pattern = args.get("pattern")
+    pattern = args.get("pattern")
     diagnostics = args.get("diagnostics", True)
     ignore_edited = args.get("ignore_edited", False)
     ignore_reacted = args.get("ignore_reacted", True)
@@ -79,19 +80,17 @@ def listener(**args) -> CommandHandlerDecorator:
                 )
             else:
                 block_process = True
-        real_command = (
-            alias_command(command, disallow_alias)
-            if parent_command is None
-            else f"{parent_command} {command}"
-        )
-        pattern = rf"^(,|，){real_command}(?: |$)([\s\S]*)"
-        sudo_pattern = rf"^(/){real_command}(?: |$)([\s\S]*)"
+        if parent_command is None:
+            route = (alias_command(command, disallow_alias), None)
+        else:
+            route = (parent_command, command)
+        command_router.register(*route)
+        module_registry.add_route(*route)
+        pattern = None
     if pattern is not None and not pattern.startswith("(?i)"):
         args["pattern"] = f"(?i){pattern}"
     else:
         args["pattern"] = pattern
-    if sudo_pattern is not None and not sudo_pattern.startswith("(?i)"):
-        sudo_pattern = f"(?i){sudo_pattern}"
     if outgoing and not incoming:
         base_filters = filters.me & ~filters.via_bot
     elif incoming and not outgoing:
@@ -108,13 +107,16 @@ def listener(**args) -> CommandHandlerDecorator:
         sudo_filters &= ~mod_filters.reacted
     if args["pattern"]:
         base_filters &= filters.regex(args["pattern"])
-        sudo_filters &= filters.regex(sudo_pattern)
     if groups_only:
         base_filters &= filters.group
         sudo_filters &= filters.group
     if privates_only:
         base_filters &= filters.private
         sudo_filters &= filters.private
+    if command is not None:
+        # check the cached command route first, so unrelated messages fail fast
+        base_filters = command_filter(*route) & base_filters
+        sudo_filters = command_filter(*route, sudo=True) & sudo_filters
     if "ignore_edited" in args:
         del args["ignore_edited"]
     if "ignore_reacted" in args:
@@ -151,8 +153,16 @@ def listener(**args) -> CommandHandlerDecorator:
             if command and parent_command is None
             else None,
         )
+        if command is None:
+            metric_name = f"{function.__module__}.{function.__name__}"
+        elif parent_command is None:
+            metric_name = alias_command(command, disallow_alias)
+        else:
+            metric_name = f"{parent_command} {command}"
+        metrics = command_metrics.get(metric_name)
 
         async def handler(client: Client, message: Message):
+            claimed = False
             try:
                 # ignore
                 try:
@@ -162,8 +172,20 @@ def listener(**args) -> CommandHandlerDecorator:
                     raise ContinuePropagation
                 except BaseException:
                     pass
+                # solve same process
+                if not read_context.add((message.chat.id, message.id)):
+                    raise ContinuePropagation
+                claimed = True
+                # timed after the dedup check, duplicates are not counted
+                start = perf_counter()
                 try:
-                    arguments = message.matches[0].group(2)
+                    if command is not None:
+                        parsed = command_router.parse(message)
+                        arguments = (
+                            parsed.sub_arguments if parent_command else parsed.arguments
+                        )
+                    else:
+                        arguments = message.matches[0].group(2)
                     parameter = arguments.split(" ")
                     if parameter == [""]:
                         parameter = []
@@ -175,25 +197,30 @@ def listener(**args) -> CommandHandlerDecorator:
                 except BaseException:
                     message.parameter = None
                     message.arguments = None
-                # solve same process
-                async with _lock:
-                    if (message.chat.id, message.id) in read_context:
-                        raise ContinuePropagation
-                    read_context[(message.chat.id, message.id)] = True
+                metrics.observe("parse", perf_counter() - start)
 
+                metrics.calls += 1
                 if command:
+                    start = perf_counter()
                     await Hook.command_pre(
                         message,
                         parent_command or command,
                         command if parent_command else None,
                     )
-                await func.handler(client, message)
+                    metrics.observe("pre_hooks", perf_counter() - start)
+                start = perf_counter()
+                try:
+                    await func.handler(client, message)
+                finally:
+                    metrics.observe("handler", perf_counter() - start)
                 if command:
+                    start = perf_counter()
                     await Hook.command_post(
                         message,
                         parent_command or command,
                         command if parent_command else None,
                     )
+                    metrics.observe("post_hooks", perf_counter() - start)
             except StopPropagation as e:
                 raise StopPropagation from e
             except KeyboardInterrupt as e:
@@ -205,7 +232,8 @@ def listener(**args) -> CommandHandlerDecorator:
                 Flood,
                 Forbidden,
                 PeerIdInvalid,
-            ):
+            ) as e:
+                metrics.error(e, flood=isinstance(e, Flood))
                 logs.warning(
                     "An unknown chat error occurred while processing a command.",
                 )
@@ -232,6 +260,7 @@ def listener(**args) -> CommandHandlerDecorator:
                 await Hook.shutdown()
                 web.stop()
             except BaseException as exc:
+                metrics.error(exc)
                 exc_info = sys.exc_info()[1]
                 exc_format = format_exc()
                 with contextlib.suppress(BaseException):
@@ -251,35 +280,33 @@ def listener(**args) -> CommandHandlerDecorator:
                         "PGP Error report generated.",
                     )
                 await Hook.process_error_exec(message, command, exc_info, exc_format)
-            if (message.chat.id, message.id) in read_context:
-                del read_context[(message.chat.id, message.id)]
+            finally:
+                # allow the command to run again when the message is edited
+                if claimed:
+                    read_context.discard((message.chat.id, message.id))
             if block_process or (parent_command and not allow_parent):
                 message.stop_propagation()
             message.continue_propagation()
 
-        bot.dispatcher.add_handler(
-            MessageHandler(handler, filters=base_filters),
-            group=0 + priority,
-            first=parent_command and not allow_parent,
-        )
+        handler = command_metrics.track(metric_name, handler)
+        handlers = [(MessageHandler(handler, filters=base_filters), 0 + priority)]
         if command:
-            bot.dispatcher.add_handler(
-                MessageHandler(handler, filters=sudo_filters),
-                group=50 + priority,
-                first=parent_command and not allow_parent,
+            handlers.append(
+                (MessageHandler(handler, filters=sudo_filters), 50 + priority)
             )
         if not ignore_edited:
-            bot.dispatcher.add_handler(
-                EditedMessageHandler(handler, filters=base_filters),
-                group=1 + priority,
-                first=parent_command and not allow_parent,
+            handlers.append(
+                (EditedMessageHandler(handler, filters=base_filters), 1 + priority)
             )
             if command:
-                bot.dispatcher.add_handler(
-                    EditedMessageHandler(handler, filters=sudo_filters),
-                    group=51 + priority,
-                    first=parent_command and not allow_parent,
+                handlers.append(
+                    (EditedMessageHandler(handler, filters=sudo_filters), 51 + priority)
                 )
+        for pyro_handler, group in handlers:
+            bot.dispatcher.add_handler(
+                pyro_handler, group=group, first=parent_command and not allow_parent
+            )
+            module_registry.add_handler(pyro_handler, group)
 
         func.set_handler(handler)
         return func
@@ -298,7 +325,9 @@ def listener(**args) -> CommandHandlerDecorator:
                 }
             }
         )
-        all_permissions.append(Permission(permission_name))
+        permission = Permission(permission_name)
+        all_permissions.append(permission)
+        module_registry.add_help(alias_command(command), permission)
 
     return decorator
 
@@ -306,6 +335,8 @@ def listener(**args) -> CommandHandlerDecorator:
 def raw_listener(filter_s):
     """Simple Decorator To Handel Custom Filters"""
 
+    module_registry.mark_eager()
+
     def decorator(function):
         async def handler(client, message):
             # ignore
@@ -317,10 +348,8 @@ def raw_listener(filter_s):
             except BaseException:
                 pass
             # solve same process
-            async with _lock:
-                if (message.chat.id, message.id) in read_context:
-                    raise ContinuePropagation
-                read_context[(message.chat.id, message.id)] = True
+            if not read_context.add((message.chat.id, message.id)):
+                raise ContinuePropagation
             try:
                 if function.__code__.co_argcount == 1:
                     await function(message)
@@ -378,9 +407,13 @@ def raw_listener(filter_s):
                         None,
                         "Error report generated.",
                     )
+            finally:
+                read_context.done((message.chat.id, message.id))
             message.continue_propagation()
 
-        bot.add_handler(MessageHandler(handler, filters=filter_s), group=2)
+        pyro_handler = MessageHandler(handler, filters=filter_s)
+        bot.add_handler(pyro_handler, group=2)
+        module_registry.add_handler(pyro_handler, 2)
 
         return handler
 
@@ -2,7 +2,7 @@
 
 from pagermaid import log
 from pagermaid.enums.command import CommandHandler
-from pagermaid.single_utils import sqlite
+from pagermaid.single_utils import sqlite_cache
 from pagermaid.utils import lang
 from pagermaid.enums import Client, Message
 from pagermaid.listener import listener
@@ -36,7 +36,7 @@ async def ghost_true(client: Client, message: Message):
     self_user_id = myself.id
     if message.chat.id == self_user_id:
         return await message.edit(lang("ghost_e_mark"))
-    sqlite[f"ghosted.chat_id.{str(message.chat.id)}"] = True
+    sqlite_cache.set(f"ghosted.chat_id.{str(message.chat.id)}", True)
     await message.safe_delete()
     await log(
         f"{lang('ghost_set_f')} ChatID {str(message.chat.id)} {lang('ghost_set_l')}"
@@ -55,7 +55,7 @@ async def ghost_false(client: Client, message: Message):
         await message.edit(lang("ghost_e_mark"))
         return
     try:
-        del sqlite[f"ghosted.chat_id.{str(message.chat.id)}"]
+        sqlite_cache.delete(f"ghosted.chat_id.{str(message.chat.id)}")
     except KeyError:
         return await message.edit(lang("ghost_e_noexist"))
     await message.safe_delete()
@@ -70,7 +70,7 @@ async def ghost_false(client: Client, message: Message):
     command="status",
 )
 async def ghost_status(message: Message):
-    if sqlite.get(f"ghosted.chat_id.{str(message.chat.id)}", None):
+    if str(message.chat.id) in sqlite_cache.get_prefix_set("ghosted.chat_id."):
         await message.edit(lang("ghost_e_exist"))
     else:
         await message.edit(lang("ghost_e_noexist"))
@@ -106,7 +106,7 @@ async def deny_true(client: Client, message: Message):
     self_user_id = myself.id
     if message.chat.id == self_user_id:
         return await message.edit(lang("ghost_e_mark"))
-    sqlite[f"denied.chat_id.{str(message.chat.id)}"] = True
+    sqlite_cache.set(f"denied.chat_id.{str(message.chat.id)}", True)
     await message.safe_delete()
     await log(f"ChatID {str(message.chat.id)} {lang('deny_set')}")
 
@@ -124,7 +124,7 @@ async def deny_false(client: Client, message: Message):
         await message.edit(lang("ghost_e_mark"))
         return
     try:
-        del sqlite[f"denied.chat_id.{str(message.chat.id)}"]
+        sqlite_cache.delete(f"denied.chat_id.{str(message.chat.id)}")
     except KeyError:
         return await message.edit(lang("deny_e_noexist"))
     await message.safe_delete()
@@ -138,7 +138,7 @@ async def deny_false(client: Client, message: Message):
     command="status",
 )
 async def deny_status(message: Message):
-    if sqlite.get(f"denied.chat_id.{str(message.chat.id)}", None):
+    if str(message.chat.id) in sqlite_cache.get_prefix_set("denied.chat_id."):
         await message.edit(lang("deny_e_exist"))
     else:
         await message.edit(lang("deny_e_noexist"))
@@ -147,12 +147,12 @@ async def deny_status(message: Message):
 @listener(is_plugin=False, incoming=True, outgoing=False, ignore_edited=True)
 async def set_read_acknowledgement(client: Client, message: Message):
     """Event handler to infinitely read ghosted messages."""
-    if sqlite.get(f"ghosted.chat_id.{str(message.chat.id)}", None):
+    if str(message.chat.id) in sqlite_cache.get_prefix_set("ghosted.chat_id."):
         await client.read_chat_history(message.chat.id)
 
 
 @listener(is_plugin=False, incoming=True, outgoing=False, ignore_edited=True)
 async def message_removal(message: Message):
     """Event handler to infinitely delete denied messages."""
-    if sqlite.get(f"denied.chat_id.{str(message.chat.id)}", None):
+    if str(message.chat.id) in sqlite_cache.get_prefix_set("denied.chat_id."):
         await message.safe_delete()
@@ -1,74 +1,55 @@
 """ Pagermaid backup and recovery plugin. """
 import os
+import re
 import sys
-import tarfile
+from pathlib import Path
 from traceback import format_exc
 
+from pagermaid.common.backup import (
+    COMPONENTS,
+    BackupError,
+    MissingBaseError,
+    backup_manager,
+)
+from pagermaid.common.executor import executor
 from pagermaid.config import Config
 from pagermaid.listener import listener
 from pagermaid.utils import upload_attachment, lang, Message
 
-pgm_backup_zip_name = "pagermaid_backup.tar.gz"
-
-
-def make_tar_gz(output_filename, source_dirs: list):
-    """
-    压缩 tar.gz 文件
-    :param output_filename: 压缩文件名
-    :param source_dirs: 需要压缩的文件列表
-    :return: None
-    """
-    with tarfile.open(output_filename, "w:gz") as tar:
-        for i in source_dirs:
-            tar.add(i, arcname=os.path.basename(i))
-
-
-def un_tar_gz(filename, dirs):
-    """
-    解压 tar.gz 文件
-    :param filename: 压缩文件名
-    :param dirs: 解压后的存放路径
-    :return: bool
-    """
-    try:
-        t = tarfile.open(filename, "r:gz")
-        t.extractall(path=dirs)
-        return True
-    except Exception as e:
-        print(e, format_exc())
-        return False
-
 
 @listener(
-    is_plugin=False, outgoing=True, command="backup", description=lang("backup_des")
+    is_plugin=False,
+    outgoing=True,
+    command="backup",
+    description=lang("backup_des"),
+    parameters=lang("backup_parameters"),
 )
 async def backup(message: Message):
     await message.edit(lang("backup_process"))
 
-    # Remove old backup
-    if os.path.exists(pgm_backup_zip_name):
-        os.remove(pgm_backup_zip_name)
-
-    # remove mp3 , they are so big !
-    for i in os.listdir("data"):
-        if (
-            i.find(".mp3") != -1
-            or i.find(".jpg") != -1
-            or i.find(".flac") != -1
-            or i.find(".ogg") != -1
-        ):
-            os.remove(f"data{os.sep}{i}")
-
-    # run backup function
-    make_tar_gz(pgm_backup_zip_name, ["data", "plugins"])
+    # compress and hash in a worker, only changed files are written
+    try:
+        result = await executor.run_thread(
+            backup_manager.create, message.arguments == "full"
+        )
+    except BackupError as e:
+        return await message.edit(f"{lang('backup_failed')}\n`{e}`")
+    if not result:
+        return await message.edit(lang("backup_no_change"))
+    text = (
+        f"{lang('backup_full') if result.full else lang('backup_delta')} `{result.id}` \n"
+        f"{lang('backup_changed')}: `{result.changed}`, "
+        f"{lang('backup_deleted')}: `{result.deleted}`, "
+        f"{lang('backup_size')}: `{result.size / 1024 / 1024:.2f} MB`"
+    )
     if Config.LOG:
         try:
-            await upload_attachment(pgm_backup_zip_name, Config.LOG_ID, None)
-            await message.edit(lang("backup_success_channel"))
+            for part in result.parts:
+                await upload_attachment(str(part), Config.LOG_ID, None)
+            return await message.edit(f"{lang('backup_success_channel')}\n\n{text}")
         except Exception:
-            await message.edit(lang("backup_success"))
-    else:
-        await message.edit(lang("backup_success"))
+            pass
+    await message.edit(f"{lang('backup_success')}\n\n{text}")
 
 
 @listener(
@@ -77,35 +58,57 @@ async def backup(message: Message):
     command="recovery",
     need_admin=True,
     description=lang("recovery_des"),
+    parameters=lang("recovery_parameters"),
 )
 async def recovery(message: Message):
-    reply = message.reply_to_message
-
-    if not reply:
-        return await message.edit(lang("recovery_file_error"))
-    if not reply.document:
-        return await message.edit(lang("recovery_file_error"))
+    local = "local" in message.parameter
+    components = {i for i in message.parameter if i != "local"}
+    if components - set(COMPONENTS):
+        return await message.edit(lang("arg_error"))
 
-    try:
-        if ".tar.gz" not in reply.document.file_name:
+    reply = message.reply_to_message
+    file_name = None
+    if local:
+        archives = backup_manager.local_chain()
+        if not archives:
+            return await message.edit(lang("recovery_file_not_found"))
+    else:
+        if not reply or not reply.document:
             return await message.edit(lang("recovery_file_error"))
-        await message.edit(lang("recovery_down"))
-        # Start download process
-        pgm_backup_zip_name = await reply.download()  # noqa
-    except Exception as e:  # noqa
-        print(e, format_exc())
-        return await message.edit(lang("recovery_file_error"))
-    # Extract backup files
-    await message.edit(lang("recovery_process"))
-    if not os.path.exists(pgm_backup_zip_name):
-        return await message.edit(lang("recovery_file_not_found"))
-    elif not un_tar_gz(pgm_backup_zip_name, ""):
-        os.remove(pgm_backup_zip_name)
-        return await message.edit(lang("recovery_file_error"))
-
-    # Cleanup
-    if os.path.exists(pgm_backup_zip_name):
-        os.remove(pgm_backup_zip_name)
+        name = reply.document.file_name or ""
+        # a single part of a split archive can not be restored on its own
+        if re.search(r"\.tar\.(gz|zst)\.\d{3}$", name):
+            return await message.edit(lang("recovery_split_archive"))
+        if not name.endswith((".tar.gz", ".tar.zst")):
+            return await message.edit(lang("recovery_file_error"))
+        try:
+            await message.edit(lang("recovery_down"))
+            file_name = await reply.download()
+        except Exception as e:  # noqa
+            print(e, format_exc())
+            return await message.edit(lang("recovery_file_error"))
+        if not file_name or not os.path.exists(file_name):
+            return await message.edit(lang("recovery_file_not_found"))
+        archives = [[Path(file_name)]]
 
-    await message.edit(lang("recovery_success") + " " + lang("apt_reboot"))
+    # extract and verify in a worker, files are only swapped in once all of them are valid
+    await message.edit(lang("recovery_process"))
+    try:
+        result = await executor.run_thread(backup_manager.restore, archives, components)
+    except MissingBaseError as e:
+        return await message.edit(f"{lang('recovery_missing_base')}\n`{e}`")
+    except BackupError as e:
+        return await message.edit(f"{lang('recovery_verify_failed')}\n`{e}`")
+    finally:
+        if file_name and os.path.exists(file_name):
+            os.remove(file_name)
+
+    text = (
+        f"{lang('recovery_success')} "
+        f"{lang('recovery_restored')}: `{result.restored}`, "
+        f"{lang('backup_deleted')}: `{result.deleted}`"
+    )
+    if not result.verified:
+        text += f"\n{lang('recovery_unverified')}"
+    await message.edit(f"{text}\n{lang('apt_reboot')}")
     sys.exit(0)
@@ -6,12 +6,24 @@ from pyrogram.enums import ParseMode
 from pagermaid import help_messages, Config
 from pagermaid.common.alias import AliasManager
 from pagermaid.config import CONFIG_PATH
-from pagermaid.group_manager import enforce_permission
+from pagermaid.group_manager import enforce_permission, enforce_many
 from pagermaid.common.reload import reload_all
 from pagermaid.utils import lang, Message, from_self, from_msg_get_sudo_uid
 from pagermaid.listener import listener
 
 
+def get_allowed_commands(message: Message) -> list:
+    """Commands the sender may use, sorted by name."""
+    commands = sorted(help_messages)
+    if from_self(message):
+        return commands
+    allowed = enforce_many(
+        from_msg_get_sudo_uid(message),
+        [help_messages[command]["permission"] for command in commands],
+    )
+    return [command for command, status in zip(commands, allowed) if status]
+
+
 @listener(
     is_plugin=False,
     command="help",
@@ -94,20 +106,15 @@ async def help_command(message: Message):
             "chat",
             "update",
         ]
-        for command in sorted(help_messages, reverse=False):
+        allowed_commands = get_allowed_commands(message)
+        for command in allowed_commands:
             if str(command) in support_commands:
                 continue
-            if from_self(message) or enforce_permission(
-                from_msg_get_sudo_uid(message), help_messages[command]["permission"]
-            ):
-                result += f"`{command}`, "
+            result += f"`{command}`, "
         if result == f"**{lang('help_list')}: \n**":
             """The help raw command,"""
-            for command in sorted(help_messages, reverse=False):
-                if from_self(message) or enforce_permission(
-                    from_msg_get_sudo_uid(message), help_messages[command]["permission"]
-                ):
-                    result += f"`{command}`, "
+            for command in allowed_commands:
+                result += f"`{command}`, "
         await message.edit(
             result[:-2]
             + f"\n**{lang('help_send')} \",help <{lang('command')}>\" {lang('help_see')}**\n"
@@ -140,11 +147,8 @@ async def help_raw_command(message: Message):
             await message.edit(lang("arg_error"))
     else:
         result = f"**{lang('help_list')}: \n**"
-        for command in sorted(help_messages, reverse=False):
-            if from_self(message) or enforce_permission(
-                from_msg_get_sudo_uid(message), help_messages[command]["permission"]
-            ):
-                result += f"`{command}`, "
+        for command in get_allowed_commands(message):
+            result += f"`{command}`, "
         await message.edit(
             f"""{result[:-2]}\n**{lang('help_send')} ",help <{lang('command')}>" {lang('help_see')}** [{lang('help_source')}](https://t.me/PagerMaid_Modify)""",
             parse_mode=ParseMode.MARKDOWN,
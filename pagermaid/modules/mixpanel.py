@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import datetime
 import json
@@ -5,7 +6,7 @@ import time
 import uuid
 import random
 from asyncio import sleep
-from typing import Union
+from typing import Dict, List, Optional, Union
 
 from pyrogram.raw.functions.channels import (
     GetSponsoredMessages,
@@ -32,12 +33,32 @@ class DatetimeSerializer(json.JSONEncoder):
 
 
 class Mixpanel:
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        api_host: str = "api.mixpanel.com",
+        scheme: str = "https",
+        batch_size: int = 50,
+        flush_interval: float = 10.0,
+        max_queue: int = 1000,
+    ):
         self._token = token
         self._serializer = DatetimeSerializer
         self._request = request
-        self.api_host = "api.mixpanel.com"
+        self.api_host = api_host
+        self.scheme = scheme
         self.is_people_set = False
+        # events are buffered and sent to /track in batches (max 50 per request)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._events: List[Dict] = []
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
 
     @staticmethod
     def _now():
@@ -54,21 +75,85 @@ class Mixpanel:
 
     async def api_call(self, endpoint, json_message):
         _endpoints = {
-            "events": f"https://{self.api_host}/track",
-            "people": f"https://{self.api_host}/engage",
+            "events": f"{self.scheme}://{self.api_host}/track",
+            "people": f"{self.scheme}://{self.api_host}/engage",
         }
         request_url = _endpoints.get(endpoint)
         if request_url is None:
-            return
+            return False
         params = {
             "data": json_message,
             "verbose": 1,
             "ip": 0,
         }
         start = self._now()
+        success = False
         with contextlib.suppress(Exception):
-            await self._request.post(request_url, data=params, timeout=10.0)
+            resp = await self._request.post(request_url, data=params, timeout=10.0)
+            success = not resp.is_error
         logs.debug(f"Mixpanel request took {self._now() - start} seconds")
+        return success
+
+    def _ensure_flush_task(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+            self._flush_event = asyncio.Event()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        # exits once the buffer is empty, the next event starts it again
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_event.wait(), self.flush_interval)
+            self._flush_event.clear()
+            await self.flush()
+            if not self._events:
+                break
+
+    def enqueue(self, event: Dict) -> bool:
+        """Buffer an event, flush when a batch is full, drop when the queue is full."""
+        if len(self._events) >= self.max_queue:
+            self.dropped += 1
+            return False
+        self._events.append(event)
+        self._ensure_flush_task()
+        if len(self._events) >= self.batch_size:
+            self._flush_event.set()
+        return True
+
+    async def flush(self):
+        if not self._events:
+            return
+        async with self._flush_lock:
+            while self._events:
+                batch = self._events[: self.batch_size]
+                del self._events[: self.batch_size]
+                if await self.api_call(
+                    "events", self.json_dumps(batch, cls=self._serializer)
+                ):
+                    self.sent += len(batch)
+                else:
+                    self.failed += len(batch)
+
+    async def close(self):
+        """Let the background flusher send what is left, then flush the rest."""
+        if self._flush_lock is None:
+            return
+        if not self._flush_task.done():
+            # wake it up instead of cancelling, a batch taken off the buffer is
+            # only sent by the flush that took it
+            self._flush_event.set()
+            await asyncio.shield(self._flush_task)
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._events),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
 
     async def people_set(
         self, distinct_id: str, properties: dict, force_update: bool = False
@@ -104,9 +189,7 @@ class Mixpanel:
             "event": event_name,
             "properties": all_properties,
         }
-        return await self.api_call(
-            "events", self.json_dumps(event, cls=self._serializer)
-        )
+        return self.enqueue(event)
 
 
 mp = Mixpanel(Config.MIXPANEL_API)
@@ -133,6 +216,11 @@ async def mixpanel_init_id(bot: Client):
     await log_sponsored_clicked()
 
 
+@Hook.on_shutdown()
+async def mixpanel_flush():
+    await mp.close()
+
+
 @Hook.command_postprocessor()
 async def mixpanel_report(bot: Client, message: Message, command, sub_command):
     if not Config.ALLOW_ANALYTIC:
@@ -147,12 +235,10 @@ async def mixpanel_report(bot: Client, message: Message, command, sub_command):
     properties = {"command": command, "bot_id": bot.me.id}
     if sub_command:
         properties["sub_command"] = sub_command
-    bot.loop.create_task(
-        mp.track(
-            str(sender_id),
-            f"Function {command}",
-            properties,
-        )
+    await mp.track(
+        str(sender_id),
+        f"Function {command}",
+        properties,
     )
 
 
@@ -171,12 +257,10 @@ async def read_sponsored(
         ViewSponsoredMessage(channel=channel, random_id=random_id)
     )
     if result:
-        bot.loop.create_task(
-            mp.track(
-                str(bot.me.id),
-                "Sponsored Read",
-                {"channel_id": channel.channel_id, "bot_id": bot.me.id},
-            )
+        await mp.track(
+            str(bot.me.id),
+            "Sponsored Read",
+            {"channel_id": channel.channel_id, "bot_id": bot.me.id},
         )
     logs.debug(f"Read sponsored message {random_id}: {result}")
     return result
@@ -189,12 +273,10 @@ async def click_sponsored(
         ClickSponsoredMessage(channel=channel, random_id=random_id)
     )
     if result:
-        bot.loop.create_task(
-            mp.track(
-                str(bot.me.id),
-                "Sponsored Click",
-                {"channel_id": channel.channel_id, "bot_id": bot.me.id},
-            )
+        await mp.track(
+            str(bot.me.id),
+            "Sponsored Click",
+            {"channel_id": channel.channel_id, "bot_id": bot.me.id},
         )
     logs.debug(f"Click sponsored message {random_id}: {result}")
     return result
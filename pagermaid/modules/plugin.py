@@ -8,7 +8,7 @@ from shutil import copyfile, move
 
 from pagermaid import log, working_dir
 from pagermaid.common.plugin import plugin_remote_manager, plugin_manager
-from pagermaid.common.reload import reload_all
+from pagermaid.common.reload import reload_plugins
 from pagermaid.enums import Message
 from pagermaid.listener import listener
 from pagermaid.utils import upload_attachment, lang
@@ -59,7 +59,7 @@ async def plugin(message: Message):
                 f"{plugin_name} {lang('apt_installed')}"
             )
             await log(f"{lang('apt_install_success')} {plugin_name}.")
-            await reload_all()
+            await reload_plugins()
         elif len(message.parameter) >= 2:
             await plugin_manager.load_remote_plugins()
             process_list = message.parameter
@@ -68,19 +68,20 @@ async def plugin(message: Message):
             success_list = []
             failed_list = []
             no_need_list = []
+            install_list = []
             for i in process_list:
                 if plugin_manager.get_remote_plugin(i):
                     local_temp = plugin_manager.get_local_plugin(i)
                     if local_temp and not plugin_manager.plugin_need_update(i):
                         no_need_list.append(i)
                     else:
-                        try:
-                            if await plugin_manager.install_remote_plugin(i):
-                                success_list.append(i)
-                            else:
-                                failed_list.append(i)
-                        except Exception:
-                            failed_list.append(i)
+                        install_list.append(i)
+                else:
+                    failed_list.append(i)
+            results = await plugin_manager.install_remote_plugins(install_list)
+            for i, result in results.items():
+                if result:
+                    success_list.append(i)
                 else:
                     failed_list.append(i)
             text = f"<b>{lang('apt_name')}</b>\n\n"
@@ -96,7 +97,7 @@ async def plugin(message: Message):
             restart = len(success_list) > 0
             await message.edit(text)
             if restart:
-                await reload_all()
+                await reload_plugins()
         else:
             await message.edit(lang("arg_error"))
     elif message.parameter[0] == "remove":
@@ -106,7 +107,7 @@ async def plugin(message: Message):
                     f"{lang('apt_remove_success')} {message.parameter[1]}"
                 )
                 await log(f"{lang('apt_remove')} {message.parameter[1]}.")
-                await reload_all()
+                await reload_plugins()
             elif "/" in message.parameter[1]:
                 await message.edit(lang("arg_error"))
             else:
@@ -146,7 +147,7 @@ async def plugin(message: Message):
                     f"{lang('apt_enable')}"
                 )
                 await log(f"{lang('apt_enable')} {message.parameter[1]}.")
-                await reload_all()
+                await reload_plugins()
             else:
                 await message.edit(lang("apt_not_exist"))
         else:
@@ -159,7 +160,7 @@ async def plugin(message: Message):
                     f"{lang('apt_disable')}"
                 )
                 await log(f"{lang('apt_disable')} {message.parameter[1]}.")
-                await reload_all()
+                await reload_plugins()
             else:
                 await message.edit(lang("apt_not_exist"))
         else:
@@ -214,7 +215,7 @@ async def plugin(message: Message):
                 + "\n"
                 + "、".join(updated_plugins)
             )
-            await reload_all()
+            await reload_plugins()
     elif message.parameter[0] == "search":
         if len(message.parameter) == 1:
             await message.edit(lang("apt_search_no_name"))
@@ -303,7 +304,8 @@ async def apt_source(message: Message):
             url += "/"
         if message.parameter[0] == "add":
             try:
-                status = await plugin_manager.fetch_remote_url(url)
+                await plugin_manager.index_cache.fetch(url)
+                status = bool(plugin_manager.index_cache.indexes[url].plugins)
             except Exception:
                 status = False
             if status:
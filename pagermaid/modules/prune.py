@@ -1,8 +1,13 @@
 """ Module to automate message deletion. """
 
 from asyncio import sleep
+from typing import AsyncIterator
+
+from pyrogram.enums import ChatType
+from pyrogram.errors import ChatAdminRequired, Forbidden
 
 from pagermaid import log
+from pagermaid.common.prune import PruneJob, cancel_prune, is_pruning
 from pagermaid.listener import listener
 from pagermaid.enums import Client, Message
 from pagermaid.utils import lang
@@ -10,43 +15,125 @@ from pagermaid.utils import lang
 import contextlib
 
 
+def prune_progress(message: Message):
+    async def progress(job: PruneJob):
+        await message.edit(
+            f"{lang('prune_process')} {job.deleted} / {job.collected} {lang('prune_hint2')}"
+        )
+
+    return progress
+
+
+async def run_job(message: Message, job: PruneJob, source: AsyncIterator[int]) -> bool:
+    """Run the job, report a missing delete right on the command message."""
+    try:
+        await job.run(source)
+    except (Forbidden, ChatAdminRequired) as e:
+        await message.edit(
+            f"{lang('prune_forbidden')} {job.deleted} / {job.collected} "
+            f"{lang('prune_hint2')}\n`{e}`"
+        )
+        return False
+    return True
+
+
+async def history_ids(client: Client, message: Message) -> AsyncIterator[int]:
+    """Ids from the replied message up to the command, walking the history."""
+    reply_id = message.reply_to_message.id
+    limit = message.id - reply_id + 1
+    if message.message_thread_id:
+        func = client.get_discussion_replies(
+            message.chat.id, message.message_thread_id, limit=limit
+        )
+    else:
+        func = client.get_chat_history(message.chat.id, limit=limit)
+    async for msg in func:
+        if msg.id < reply_id:
+            break
+        if msg.id != message.id:
+            yield msg.id
+        if msg.reply_to_message:
+            yield msg.reply_to_message.id
+
+
+async def range_ids(message: Message) -> AsyncIterator[int]:
+    """
+    Ids from the command down to the replied message without reading history,
+    message ids of supergroups and channels are sequential per chat.
+    """
+    for message_id in range(message.id - 1, message.reply_to_message.id - 1, -1):
+        yield message_id
+
+
+def can_prune_by_range(message: Message) -> bool:
+    # basic groups and private chats share ids across the account, topics
+    # interleave with the rest of the chat
+    return (
+        message.chat.type in (ChatType.SUPERGROUP, ChatType.CHANNEL)
+        and not message.message_thread_id
+    )
+
+
+async def user_ids(
+    client: Client, message: Message, job: PruneJob, user, count: int, offset: int = 0
+) -> AsyncIterator[int]:
+    """Ids of the latest `count` messages sent by user, recent history first."""
+
+    def is_target(msg) -> bool:
+        if not msg.from_user:
+            return False
+        return msg.from_user.is_self if user == "me" else msg.from_user.id == user
+
+    async for msg in client.get_chat_history(message.chat.id, limit=100):
+        if job.collected >= count:
+            return
+        if msg.id != message.id and is_target(msg):
+            yield msg.id
+    async for msg in client.search_messages(
+        message.chat.id, from_user=user, offset=offset
+    ):
+        if job.collected >= count:
+            return
+        if msg.id != message.id:
+            yield msg.id
+
+
 @listener(
     is_plugin=False,
     outgoing=True,
     command="prune",
     need_admin=True,
     description=lang("prune_des"),
+    parameters=lang("prune_parameters"),
 )
 async def prune(client: Client, message: Message):
     """Purge every single message after the message you replied to."""
+    if message.arguments == "cancel":
+        if cancel_prune(message.chat.id):
+            return await message.edit(lang("prune_cancelled"))
+        return await message.edit(lang("prune_no_job"))
     if not message.reply_to_message:
         await message.edit(lang("not_reply"))
         return
-    input_chat = message.chat.id
-    messages = []
-    count = 0
-    limit = message.id - message.reply_to_message.id + 1
-    if message.message_thread_id:
-        func = client.get_discussion_replies(
-            input_chat, message.message_thread_id, limit=limit
-        )
+    if is_pruning(message.chat.id):
+        return await message.edit(lang("prune_running"))
+    job = PruneJob(client, message.chat.id, progress=prune_progress(message))
+    if can_prune_by_range(message):
+        if not await run_job(message, job, range_ids(message)):
+            return
+        # the range includes ids of messages that no longer exist
+        total = job.deleted + job.failed + 1
     else:
-        func = client.get_chat_history(input_chat, limit=limit)
-    async for msg in func:
-        if msg.id < message.reply_to_message.id:
-            break
-        messages.append(msg.id)
-        count += 1
-        if msg.reply_to_message:
-            messages.append(msg.reply_to_message.id)
-        if len(messages) == 100:
-            await client.delete_messages(input_chat, messages)
-            messages = []
-
-    if messages:
-        await client.delete_messages(input_chat, messages)
-    await log(f"{lang('prune_hint1')} {str(count)} {lang('prune_hint2')}")
-    notification = await send_prune_notify(client, message, count, count)
+        if not await run_job(message, job, history_ids(client, message)):
+            return
+        total = job.collected + 1
+    with contextlib.suppress(Exception):
+        await message.delete()
+    count = job.deleted + 1
+    await log(
+        f"{lang('prune_hint1')} {str(count)} {lang('prune_hint2')}{failed_hint(job.failed)}"
+    )
+    notification = await send_prune_notify(client, message, count, total, job.failed)
     await sleep(1)
     await notification.delete()
 
@@ -61,8 +148,6 @@ async def prune(client: Client, message: Message):
 )
 async def self_prune(bot: Client, message: Message):
     """Deletes specific amount of messages you sent."""
-    msgs = []
-    count_buffer = 0
     offset = 0
     if len(message.parameter) != 1:
         if not message.reply_to_message:
@@ -70,37 +155,28 @@ async def self_prune(bot: Client, message: Message):
         offset = message.reply_to_message.id
     try:
         count = int(message.parameter[0])
-        await message.delete()
     except ValueError:
         await message.edit(lang("arg_error"))
         return
-    async for msg in bot.get_chat_history(message.chat.id, limit=100):
-        if count_buffer == count:
-            break
-        if msg.from_user and msg.from_user.is_self:
-            msgs.append(msg.id)
-            count_buffer += 1
-            if len(msgs) == 100:
-                await bot.delete_messages(message.chat.id, msgs)
-                msgs = []
-    async for msg in bot.search_messages(
-        message.chat.id, from_user="me", offset=offset
+    if is_pruning(message.chat.id):
+        return await message.edit(lang("prune_running"))
+    job = PruneJob(bot, message.chat.id, progress=prune_progress(message))
+    if not await run_job(
+        message, job, user_ids(bot, message, job, "me", count, offset)
     ):
-        if count_buffer == count:
-            break
-        msgs.append(msg.id)
-        count_buffer += 1
-        if len(msgs) == 100:
-            await bot.delete_messages(message.chat.id, msgs)
-            msgs = []
-    if msgs:
-        await bot.delete_messages(message.chat.id, msgs)
+        return
+    with contextlib.suppress(Exception):
+        await message.delete()
+    count_buffer = job.deleted
     await log(
         f"{lang('prune_hint1')}{lang('sp_hint')} {str(count_buffer)} / {count} {lang('prune_hint2')}"
+        f"{failed_hint(job.failed)}"
     )
 
     with contextlib.suppress(ValueError):
-        notification = await send_prune_notify(bot, message, count_buffer, count)
+        notification = await send_prune_notify(
+            bot, message, count_buffer, count, job.failed
+        )
         await sleep(1)
         await notification.delete()
 
@@ -122,43 +198,29 @@ async def your_prune(bot: Client, message: Message):
         return await message.edit(lang("not_reply"))
     if len(message.parameter) != 1:
         return await message.edit(lang("arg_error"))
-    count = 0
     try:
         count = int(message.parameter[0])
-        await message.delete()
     except ValueError:
         return await message.edit(lang("arg_error"))
-    except Exception:  # noqa
-        pass
-    count_buffer = 0
-    msgs = []
-    async for msg in bot.get_chat_history(message.chat.id, limit=100):
-        if count_buffer == count:
-            break
-        if msg.from_user and msg.from_user.id == target.from_user.id:
-            msgs.append(msg.id)
-            count_buffer += 1
-            if len(msgs) == 100:
-                await bot.delete_messages(message.chat.id, msgs)
-                msgs = []
-    async for msg in bot.search_messages(
-        message.chat.id, from_user=target.from_user.id
+    if is_pruning(message.chat.id):
+        return await message.edit(lang("prune_running"))
+    job = PruneJob(bot, message.chat.id, progress=prune_progress(message))
+    if not await run_job(
+        message, job, user_ids(bot, message, job, target.from_user.id, count)
     ):
-        if count_buffer == count:
-            break
-        count_buffer += 1
-        msgs.append(msg.id)
-        if len(msgs) == 100:
-            await bot.delete_messages(message.chat.id, msgs)
-            msgs = []
-    if msgs:
-        await bot.delete_messages(message.chat.id, msgs)
+        return
+    with contextlib.suppress(Exception):
+        await message.delete()
+    count_buffer = job.deleted
     await log(
         f"{lang('prune_hint1')}{lang('yp_hint')} {str(count_buffer)} / {count} {lang('prune_hint2')}"
+        f"{failed_hint(job.failed)}"
     )
 
     with contextlib.suppress(ValueError):
-        notification = await send_prune_notify(bot, message, count_buffer, count)
+        notification = await send_prune_notify(
+            bot, message, count_buffer, count, job.failed
+        )
         await sleep(1)
         await notification.delete()
 
@@ -181,9 +243,15 @@ async def delete(message: Message):
         await message.delete()
 
 
-async def send_prune_notify(bot: Client, message: Message, count_buffer, count):
+def failed_hint(failed: int) -> str:
+    return f" {lang('prune_failed')}: {failed}" if failed else ""
+
+
+async def send_prune_notify(
+    bot: Client, message: Message, count_buffer, count, failed: int = 0
+):
     return await bot.send_message(
         message.chat.id,
-        f"{lang('spn_deleted')} {str(count_buffer)} / {str(count)} {lang('prune_hint2')}",
+        f"{lang('spn_deleted')} {str(count_buffer)} / {str(count)} {lang('prune_hint2')}{failed_hint(failed)}",
         message_thread_id=message.message_thread_id,
     )
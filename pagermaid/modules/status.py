@@ -19,7 +19,10 @@ from shutil import disk_usage
 from subprocess import Popen, PIPE
 
 from pagermaid import Config, pgm_version
+from pagermaid.common.dialogs import dialog_index
+from pagermaid.common.profiler import startup_profiler
 from pagermaid.common.status import get_bot_uptime
+from pagermaid.common.watchdog import loop_watchdog
 from pagermaid.enums import Client, Message
 from pagermaid.listener import listener
 from pagermaid.utils import lang, execute
@@ -32,7 +35,6 @@ DCs = {
     5: "91.108.56.130",
 }
 
-
 @listener(is_plugin=False, command="sysinfo", description=lang("sysinfo_des"))
 async def sysinfo(message: Message):
     """Retrieve system information via neofetch."""
@@ -58,28 +60,64 @@ async def status(message: Message):
         f"{lang('status_python')}: `{python_version()}` \n"
         f"{lang('status_pyrogram')}: `{__version__}` \n"
         f"{lang('status_pgm')}: `{pgm_version}`\n"
-        f"{lang('status_uptime')}: `{uptime}`"
+        f"{lang('status_uptime')}: `{uptime}`\n"
+        f"{lang('status_loop_lag')}: `{loop_watchdog.avg_lag * 1000:.1f}ms / "
+        f"{loop_watchdog.max_lag * 1000:.1f}ms`\n"
+        f"{lang('status_loop_blocks')}: `{loop_watchdog.blocks}`"
+    )
+    if report := next(iter(reversed(loop_watchdog.reports)), None):
+        text += (
+            f"\n{lang('status_loop_last_block')}: `{report.duration:.2f}s`, "
+            f"`{report.command or report.location or '-'}`"
+        )
+    await message.edit(text)
+
+
+@listener(
+    is_plugin=False,
+    command="startup",
+    description=lang("startup_des"),
+    parameters="<num>",
+)
+async def startup(message: Message):
+    """Show the slowest modules and plugins imported at startup."""
+    try:
+        num = int(message.arguments) if message.arguments else 10
+    except ValueError:
+        return await message.edit(lang("arg_error"))
+    data = startup_profiler.dict()
+    text = (
+        f"**{lang('startup_hint')}** \n"
+        f"{lang('startup_core')}: `{data['core_seconds']:.2f}s` \n"
+        f"{lang('startup_total')}: `{data['total_seconds']:.2f}s`, "
+        f"`{data['memory'] / 1024 / 1024:+.1f} MB` \n"
     )
+    for record in startup_profiler.top(num):
+        text += (
+            f"\n`{record.name}` ({record.kind}"
+            f"{', ' + lang('startup_lazy') if record.lazy else ''}"
+            f"{', ' + lang('startup_failed') if record.error else ''}): "
+            f"`{record.seconds * 1000:.1f} ms`, `{record.memory / 1024 / 1024:+.1f} MB`"
+        )
     await message.edit(text)
 
 
-@listener(is_plugin=False, command="stats", description=lang("stats_des"))
+@listener(
+    is_plugin=False,
+    command="stats",
+    description=lang("stats_des"),
+    parameters=lang("stats_parameters"),
+)
 async def stats(client: Client, message: Message):
     msg = await message.edit(lang("stats_loading"))
-    a, u, g, s, c, b = 0, 0, 0, 0, 0, 0
-    for dialog in await client.get_dialogs_list():
-        chat_type = dialog.chat.type
-        if chat_type == ChatType.BOT:
-            b += 1
-        elif chat_type == ChatType.PRIVATE:
-            u += 1
-        elif chat_type == ChatType.GROUP:
-            g += 1
-        elif chat_type == ChatType.SUPERGROUP:
-            s += 1
-        elif chat_type == ChatType.CHANNEL:
-            c += 1
-        a += 1
+    await dialog_index.ensure(client, rebuild=message.arguments == "refresh")
+    counts = dialog_index.counts
+    a = sum(counts.values())
+    u = counts[ChatType.PRIVATE.value]
+    g = counts[ChatType.GROUP.value]
+    s = counts[ChatType.SUPERGROUP.value]
+    c = counts[ChatType.CHANNEL.value]
+    b = counts[ChatType.BOT.value]
     text = (
         f"**{lang('stats_hint')}** \n"
         f"{lang('stats_dialogs')}: `{a}` \n"
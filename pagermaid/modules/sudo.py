@@ -1,5 +1,5 @@
 from pagermaid.enums.command import CommandHandler
-from pagermaid.single_utils import sqlite
+from pagermaid.single_utils import sqlite_cache
 from pagermaid.listener import listener
 from pagermaid.group_manager import (
     add_permission_for_group,
@@ -10,6 +10,7 @@ from pagermaid.group_manager import (
     add_permission_for_user,
     remove_permission_for_user,
     permissions,
+    policy_batch,
 )
 from pagermaid.enums import Client, Message
 from pagermaid.utils import lang, edit_delete, _status_sudo
@@ -47,7 +48,7 @@ async def sudo_on(message: Message):
     sudo = get_sudo_list()
     if _status_sudo():
         return await edit_delete(message, lang("sudo_has_enabled"))
-    sqlite["sudo_enable"] = True
+    sqlite_cache.set("sudo_enable", True)
     text = f"__{lang('sudo_enable')}__\n"
     if len(sudo) != 0:
         return await message.edit(
@@ -67,7 +68,7 @@ async def sudo_on(message: Message):
 async def sudo_off(message: Message):
     sudo = get_sudo_list()
     if _status_sudo():
-        del sqlite["sudo_enable"]
+        sqlite_cache.delete("sudo_enable")
         text = f"__{lang('sudo_disable')}__\n"
         if len(sudo) != 0:
             return await message.edit(
@@ -91,7 +92,7 @@ async def sudo_add(message: Message):
     if from_id in sudo:
         return await edit_delete(message, f"__{lang('sudo_add')}__")
     sudo.append(from_id)
-    sqlite["sudo_list"] = sudo
+    sqlite_cache.set("sudo_list", sudo)
     add_user_to_group(str(from_id), "default")  # 添加到默认组
     if from_id > 0:
         await message.edit(f"__{lang('sudo_add')}__")
@@ -110,7 +111,7 @@ async def sudo_remove(message: Message):
     if from_id not in sudo:
         return await edit_delete(message, f"__{lang('sudo_no')}__")
     sudo.remove(from_id)
-    sqlite["sudo_list"] = sudo
+    sqlite_cache.set("sudo_list", sudo)
     if from_id > 0:
         await message.edit(f"__{lang('sudo_remove')}__")
     else:
@@ -133,7 +134,7 @@ async def sudo_list(client: Client, message: Message):
                 user = await client.get_users(i)
                 if user.is_deleted:
                     sudo.remove(i)
-                    sqlite["sudo_list"] = sudo
+                    sqlite_cache.set("sudo_list", sudo)
                     continue
                 text += f"• {user.mention()} - {' '.join(permissions.get_roles_for_user(str(i)))}\n"
             else:
@@ -146,10 +147,11 @@ async def sudo_list(client: Client, message: Message):
     await message.edit(text)
 
 
-def check_parameter_length(length: int, check_permission: bool):
+def check_parameter_length(length: int, check_permission: bool, many: bool = False):
     def decorator(func):
         async def wrapper(message: Message):
-            if len(message.parameter) != length:
+            count = len(message.parameter)
+            if count < length if many else count != length:
                 return await edit_delete(message, lang("arg_error"))
             if check_permission:
                 sudo = get_sudo_list()
@@ -208,10 +210,12 @@ async def sudo_gdelu(message: Message):
     command="uaddp",
     need_admin=True,
 )
-@check_parameter_length(2, True)
+@check_parameter_length(2, True, many=True)
 async def sudo_uaddp(message: Message):
     from_id = from_msg_get_sudo_id(message)
-    add_permission_for_user(str(from_id), Permission(message.parameter[1]))
+    with policy_batch():
+        for name in message.parameter[1:]:
+            add_permission_for_user(str(from_id), Permission(name))
     return await message.edit(lang("sudo_user_add_per"))
 
 
@@ -220,10 +224,12 @@ async def sudo_uaddp(message: Message):
     command="udelp",
     need_admin=True,
 )
-@check_parameter_length(2, True)
+@check_parameter_length(2, True, many=True)
 async def sudo_udelp(message: Message):
     from_id = from_msg_get_sudo_id(message)
-    remove_permission_for_user(str(from_id), Permission(message.parameter[1]))
+    with policy_batch():
+        for name in message.parameter[1:]:
+            remove_permission_for_user(str(from_id), Permission(name))
     return await message.edit(lang("sudo_user_del_per"))
 
 
@@ -232,9 +238,11 @@ async def sudo_udelp(message: Message):
     command="gaddp",
     need_admin=True,
 )
-@check_parameter_length(3, False)
+@check_parameter_length(3, False, many=True)
 async def sudo_gaddp(message: Message):
-    add_permission_for_group(message.parameter[1], Permission(message.parameter[2]))
+    with policy_batch():
+        for name in message.parameter[2:]:
+            add_permission_for_group(message.parameter[1], Permission(name))
     return await message.edit(lang("sudo_group_add_per"))
 
 
@@ -243,7 +251,9 @@ async def sudo_gaddp(message: Message):
     command="gdelp",
     need_admin=True,
 )
-@check_parameter_length(3, False)
+@check_parameter_length(3, False, many=True)
 async def sudo_gdelp(message: Message):
-    remove_permission_for_group(message.parameter[1], Permission(message.parameter[2]))
+    with policy_batch():
+        for name in message.parameter[2:]:
+            remove_permission_for_group(message.parameter[1], Permission(name))
     return await message.edit(lang("sudo_group_del_per"))
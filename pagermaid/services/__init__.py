@@ -1,5 +1,6 @@
 from pagermaid import bot
 from pagermaid import logs
+from pagermaid.common.executor import executor
 from pagermaid.single_utils import sqlite
 from pagermaid.scheduler import scheduler
 from pagermaid.utils import client
@@ -10,15 +11,19 @@ __all__ = [
     "sqlite",
     "scheduler",
     "client",
+    "executor",
 ]
 
 
+services = {
+    "Client": bot,
+    "Logger": logs,
+    "SqliteDict": sqlite,
+    "AsyncIOScheduler": scheduler,
+    "AsyncClient": client,
+    "ExecutorManager": executor,
+}
+
+
 def get(name: str):
-    data = {
-        "Client": bot,
-        "Logger": logs,
-        "SqliteDict": sqlite,
-        "AsyncIOScheduler": scheduler,
-        "AsyncClient": client,
-    }
-    return data.get(name)
+    return services.get(name)
@@ -1,7 +1,9 @@
 import contextlib
+from collections import OrderedDict
 from os import sep, remove, mkdir
 from os.path import exists
-from typing import List, Optional, Union
+from time import monotonic
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Union
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from pyrogram import Client as OldClient
@@ -20,23 +22,173 @@ __all__ = [
     "TimeoutConversationError",
     "ListenerCanceled",
     "get_sudo_list",
+    "get_sudo_set",
     "_status_sudo",
     "Message",
+    "ReadContext",
     "sqlite",
+    "sqlite_cache",
     "safe_remove",
 ]
 # init folders
 if not exists("data"):
     mkdir("data")
 sqlite = SqliteDict(f"data{sep}data.sqlite", autocommit=True)
+_missing = object()
 
 
-def get_sudo_list():
-    return sqlite.get("sudo_list", [])
+class SqliteCache:
+    """Process-local write-through cache in front of the sqlite dict for hot keys."""
+
+    def __init__(self, db: SqliteDict):
+        self.db = db
+        self._values: Dict[str, Any] = {}
+        self._sets: Dict[str, FrozenSet] = {}
+        self._prefix_sets: Dict[str, Set[str]] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self._values:
+            self._values[key] = self.db.get(key, _missing)
+        value = self._values[key]
+        return default if value is _missing else value
+
+    def get_set(self, key: str) -> FrozenSet:
+        """The list stored under key, as a set for membership checks."""
+        if key not in self._sets:
+            self._sets[key] = frozenset(self.get(key, []))
+        return self._sets[key]
+
+    def get_prefix_set(self, prefix: str) -> Set[str]:
+        """Suffixes of all keys named `{prefix}{suffix}` that hold a truthy value."""
+        if prefix not in self._prefix_sets:
+            self._prefix_sets[prefix] = {
+                key[len(prefix) :]
+                for key in self.db.keys()
+                if key.startswith(prefix) and self.db.get(key)
+            }
+        return self._prefix_sets[prefix]
+
+    def set(self, key: str, value: Any) -> None:
+        self.db[key] = value
+        self._update(key, value)
+
+    def delete(self, key: str) -> None:
+        del self.db[key]
+        self._update(key, _missing)
+
+    def _update(self, key: str, value: Any) -> None:
+        self._values[key] = value
+        self._sets.pop(key, None)
+        for prefix, suffixes in self._prefix_sets.items():
+            if key.startswith(prefix):
+                if value is not _missing and value:
+                    suffixes.add(key[len(prefix) :])
+                else:
+                    suffixes.discard(key[len(prefix) :])
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._sets.clear()
+        self._prefix_sets.clear()
+
+
+sqlite_cache = SqliteCache(sqlite)
+
+
+def get_sudo_list() -> List:
+    return list(sqlite_cache.get("sudo_list", []))
+
+
+def get_sudo_set() -> FrozenSet:
+    return sqlite_cache.get_set("sudo_list")
 
 
 def _status_sudo():
-    return sqlite.get("sudo_enable", False)
+    return sqlite_cache.get("sudo_enable", False)
+
+
+class ReadContext:
+    """
+    Bounded de-duplication of (chat_id, message_id) keys.
+
+    Keys being processed stay until done() or discard(), finished keys are
+    remembered for ttl seconds. Check-and-set happens without awaiting, so it
+    is atomic on the event loop and needs no lock.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        # in flight, never expired or evicted
+        self._active: Set[Hashable] = set()
+        # finished, key -> expire time
+        self._data: "OrderedDict[Hashable, float]" = OrderedDict()
+        # duplicates skipped / keys claimed by add()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, key: Hashable) -> bool:
+        """Mark key as being processed, return False if it already is or was recently."""
+        if key in self:
+            self.hits += 1
+            return False
+        self.misses += 1
+        self._data.pop(key, None)
+        self._active.add(key)
+        return True
+
+    def done(self, key: Hashable) -> None:
+        """Processing finished, keep ignoring the key for ttl seconds."""
+        self._active.discard(key)
+        now = monotonic()
+        self._data[key] = now + self.ttl
+        self._data.move_to_end(key)
+        self._evict(now)
+
+    def discard(self, key: Hashable) -> None:
+        """Forget the key, so the same message can be processed again."""
+        self._active.discard(key)
+        self._data.pop(key, None)
+
+    def _evict(self, now: float) -> None:
+        data = self._data
+        while len(data) > self.max_size:
+            data.popitem(last=False)
+        while data and next(iter(data.values())) <= now:
+            data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._active.clear()
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key in self._active:
+            return True
+        expire = self._data.get(key)
+        return expire is not None and expire > monotonic()
+
+    def __len__(self) -> int:
+        return len(self._active) + len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self._active),
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            "# HELP pagermaid_read_context_total Message de-duplication lookups.",
+            "# TYPE pagermaid_read_context_total counter",
+            f'pagermaid_read_context_total{{result="hit"}} {self.hits}',
+            f'pagermaid_read_context_total{{result="miss"}} {self.misses}',
+            "# HELP pagermaid_read_context_size Keys held by the de-duplication.",
+            "# TYPE pagermaid_read_context_size gauge",
+            f'pagermaid_read_context_size{{state="active"}} {len(self._active)}',
+            f'pagermaid_read_context_size{{state="done"}} {len(self._data)}',
+        ]
 
 
 def safe_remove(name: str) -> None:
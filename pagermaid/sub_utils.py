@@ -1,34 +1,97 @@
-from typing import List
+from os import sep
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlitedict import SqliteDict
+
 from pagermaid.single_utils import sqlite
 
+# one row per subscribed id, key: "{name}|{uid}", value: (name, uid)
+sub_sqlite = SqliteDict(f"data{sep}data.sqlite", tablename="subs", autocommit=False)
+# one shared Sub per name, so every manager of a name sees the same ids
+subs: Dict[str, "Sub"] = {}
+
 
 class Sub:
+    def __new__(cls, name: str):
+        if name not in subs:
+            subs[name] = super().__new__(cls)
+        return subs[name]
+
     def __init__(self, name: str):
+        if getattr(self, "name", None) == name:
+            return
         self.name = name
+        self._ids: Optional[Set] = None
+
+    def _key(self, uid) -> str:
+        return f"{self.name}|{uid}"
+
+    def _load(self) -> Set:
+        # keys of this name sort between "name|" and "name}", the primary key index
+        # serves the range instead of a scan of every subscription
+        query = (
+            f'SELECT value FROM "{sub_sqlite.tablename}" '
+            "WHERE key >= ? AND key < ? ORDER BY rowid"
+        )
+        rows = sub_sqlite.conn.select(
+            query,
+            (
+                sub_sqlite.encode_key(f"{self.name}|"),
+                sub_sqlite.encode_key(f"{self.name}}}"),
+            ),
+        )
+        ids = {sub_sqlite.decode(value)[1] for value, in rows}
+        # migrate the legacy pickled list
+        if (legacy := sqlite.get(f"{self.name}.sub")) is not None:
+            sub_sqlite.update({self._key(uid): (self.name, uid) for uid in legacy})
+            sub_sqlite.commit()
+            ids.update(legacy)
+            del sqlite[f"{self.name}.sub"]
+        return ids
+
+    @property
+    def ids(self) -> Set:
+        """Loaded once, every change is written through to it and to the table."""
+        if self._ids is None:
+            self._ids = self._load()
+        return self._ids
 
     def get_subs(self) -> List:
-        return sqlite.get(f"{self.name}.sub", [])
+        return list(self.ids)
 
     def clear_subs(self) -> None:
-        sqlite[f"{self.name}.sub"] = []
-        del sqlite[f"{self.name}.sub"]
+        self.remove_many(list(self.ids))
 
     def add_id(self, uid: int) -> bool:
-        data = self.get_subs()
-        if uid in data:
-            return False
-        data.append(uid)
-        sqlite[f"{self.name}.sub"] = data
-        return True
+        return self.add_many([uid]) == 1
 
     def del_id(self, uid: int) -> bool:
-        data = self.get_subs()
-        if uid not in data:
-            return False
-        data.remove(uid)
-        sqlite[f"{self.name}.sub"] = data
-        return True
+        return self.remove_many([uid]) == 1
 
     def check_id(self, uid: int) -> bool:
-        data = self.get_subs()
-        return uid in data
+        return uid in self.ids
+
+    def add_many(self, uids: Iterable[int]) -> int:
+        """Add ids in one transaction, return the number of new ids."""
+        ids = self.ids
+        new_ids = {uid for uid in uids if uid not in ids}
+        if new_ids:
+            sub_sqlite.update({self._key(uid): (self.name, uid) for uid in new_ids})
+            sub_sqlite.commit()
+            ids.update(new_ids)
+        return len(new_ids)
+
+    def remove_many(self, uids: Iterable[int]) -> int:
+        """Remove ids in one transaction, return the number of removed ids."""
+        ids = self.ids
+        old_ids = {uid for uid in uids if uid in ids}
+        for uid in old_ids:
+            del sub_sqlite[self._key(uid)]
+        if old_ids:
+            sub_sqlite.commit()
+            ids.difference_update(old_ids)
+        return len(old_ids)
+
+    def contains_many(self, uids: Iterable[int]) -> List[bool]:
+        ids = self.ids
+        return [uid in ids for uid in uids]
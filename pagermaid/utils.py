@@ -4,7 +4,6 @@ from importlib.util import find_spec
 from os.path import exists
 from typing import Optional
 
-import httpx
 from os import remove
 from sys import executable
 from asyncio import create_subprocess_shell, sleep
@@ -15,8 +14,15 @@ from pyrogram.errors import RPCError
 
 from pagermaid.config import Config
 from pagermaid import bot
+from pagermaid.common.http import create_client
 from pagermaid.group_manager import enforce_permission
-from pagermaid.single_utils import _status_sudo, get_sudo_list, Message, sqlite
+from pagermaid.single_utils import (
+    _status_sudo,
+    get_sudo_list,
+    get_sudo_set,
+    Message,
+    sqlite,
+)
 
 
 def lang(text: str) -> str:
@@ -118,7 +124,7 @@ async def edit_delete(
     parse_mode: Optional["enums.ParseMode"] = None,
     disable_web_page_preview: bool = None,
 ):
-    sudo_users = get_sudo_list()
+    sudo_users = get_sudo_set()
     from_id = message.from_user.id if message.from_user else message.sender_chat.id
     if from_id in sudo_users:
         reply_to = message.reply_to_message
@@ -161,7 +167,7 @@ def sudo_filter(permission: str):
             from_id = (
                 message.from_user.id if message.from_user else message.sender_chat.id
             )
-            sudo_list = get_sudo_list()
+            sudo_list = get_sudo_set()
             if from_id not in sudo_list:
                 if message.chat.id in sudo_list:
                     return enforce_permission(message.chat.id, flt.permission)
@@ -182,7 +188,7 @@ def from_self(message: Message) -> bool:
 def from_msg_get_sudo_uid(message: Message) -> int:
     """Get the sudo uid from the message."""
     from_id = message.from_user.id if message.from_user else message.sender_chat.id
-    return from_id if from_id in get_sudo_list() else message.chat.id
+    return from_id if from_id in get_sudo_set() else message.chat.id
 
 
 def check_manage_subs(message: Message) -> bool:
@@ -222,4 +228,4 @@ def format_exc(e: BaseException) -> str:
 headers = {
     "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/102.0.5005.72 Safari/537.36"
 }
-client = httpx.AsyncClient(timeout=10.0, headers=headers)
+client = create_client(headers)
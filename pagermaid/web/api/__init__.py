@@ -5,6 +5,10 @@ from pagermaid.web.api.bot_info import route as bot_info_route
 from pagermaid.web.api.command_alias import route as command_alias_route
 from pagermaid.web.api.ignore_groups import route as ignore_groups_route
 from pagermaid.web.api.login import route as login_route
+from pagermaid.web.api.metrics import (
+    route as metrics_route,
+    prometheus_route,
+)
 from pagermaid.web.api.plugin import route as plugin_route
 from pagermaid.web.api.status import route as status_route
 from pagermaid.web.api.web_login import (
@@ -24,4 +28,6 @@ base_api_router.include_router(login_route)
 base_api_router.include_router(command_alias_route)
 base_api_router.include_router(ignore_groups_route)
 base_api_router.include_router(web_login_route)
+base_api_router.include_router(metrics_route)
 base_html_router.include_router(web_login_html_route)
+base_html_router.include_router(prometheus_route)
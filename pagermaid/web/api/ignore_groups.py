@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from starlette.responses import JSONResponse
 
 from pagermaid.common.ignore import ignore_groups_manager, get_group_list
@@ -12,13 +12,31 @@ route = APIRouter()
     response_class=JSONResponse,
     dependencies=[authentication()],
 )
-async def get_ignore_group_list():
+async def get_ignore_group_list(
+    page: int = 1,
+    per_page: int = Query(12, alias="perPage"),
+    keywords: str = "",
+):
     try:
-        groups = []
-        for data in await get_group_list():
-            data["status"] = ignore_groups_manager.check_id(data["id"])
-            groups.append(data)
-        return {"status": 0, "msg": "ok", "data": {"groups": groups}}
+        groups = await get_group_list()
+        if keywords:
+            groups = [i for i in groups if i.match(keywords)]
+        groups.sort(key=lambda x: x.title)
+        per_page = min(max(per_page, 1), 100)
+        start = (max(page, 1) - 1) * per_page
+        items = groups[start : start + per_page]
+        status = ignore_groups_manager.contains_many([i.id for i in items])
+        return {
+            "status": 0,
+            "msg": "ok",
+            "data": {
+                "items": [
+                    {**group.dict(), "status": ignored}
+                    for group, ignored in zip(items, status)
+                ],
+                "total": len(groups),
+            },
+        }
     except BaseException:
         return {"status": -100, "msg": "获取群组列表失败"}
 
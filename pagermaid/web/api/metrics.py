@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from pagermaid import read_context
+from pagermaid.common import cache
+from pagermaid.common.executor import executor
+from pagermaid.common.metrics import command_metrics, render_prometheus
+from pagermaid.config import Config
+from pagermaid.services import client
+from pagermaid.hook import hook_latency, hook_queue, hook_timeouts
+from pagermaid.web.api.utils import authentication
+
+route = APIRouter()
+prometheus_route = APIRouter()
+
+
+@route.get(
+    "/command_metrics", response_class=JSONResponse, dependencies=[authentication()]
+)
+async def get_command_metrics():
+    rows = command_metrics.rows()
+    return {
+        "status": 0,
+        "msg": "ok",
+        "data": {
+            "in_flight": command_metrics.in_flight,
+            "read_context": read_context.stats(),
+            "rows": rows,
+            "total": len(rows),
+        },
+    }
+
+
+@prometheus_route.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    token: Optional[str] = Header(None), authorization: Optional[str] = Header(None)
+):
+    """Prometheus exporter, accepts the secret key as token or bearer token."""
+    bearer = authorization[7:] if (authorization or "").startswith("Bearer ") else None
+    if Config.WEB_SECRET_KEY and Config.WEB_SECRET_KEY not in (token, bearer):
+        return PlainTextResponse("非法请求", status_code=401)
+    return render_prometheus(hook_latency, hook_timeouts) + "\n".join(
+        [
+            *hook_queue.prometheus_lines(),
+            *executor.prometheus_lines(),
+            *cache.prometheus_lines(),
+            *read_context.prometheus_lines(),
+            *client.prometheus_lines(),
+            "",
+        ]
+    )
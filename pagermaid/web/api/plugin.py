@@ -2,7 +2,7 @@ from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
 from pagermaid.common.plugin import plugin_manager
-from pagermaid.common.reload import reload_all
+from pagermaid.common.reload import reload_plugins
 from pagermaid.web.api.utils import authentication
 
 route = APIRouter()
@@ -31,7 +31,7 @@ async def set_local_plugin_status(data: dict):
         plugin.enable()
     else:
         plugin.disable()
-    await reload_all()
+    await reload_plugins()
     return {"status": 0, "msg": f'成功{"开启" if status else "关闭"} {module_name}'}
 
 
@@ -43,7 +43,7 @@ async def remove_local_plugin(data: dict):
     if not (plugin := plugin_manager.get_local_plugin(module_name)):
         return {"status": -100, "msg": f"插件 {module_name} 不存在"}
     plugin_manager.remove_plugin(plugin.name)
-    await reload_all()
+    await reload_plugins()
     return {"status": 0, "msg": f"成功卸载 {module_name}"}
 
 
@@ -71,5 +71,5 @@ async def set_remote_plugin_status(data: dict):
         await plugin_manager.install_remote_plugin(module_name)
     else:
         plugin_manager.remove_plugin(module_name)
-    await reload_all()
+    await reload_plugins()
     return {"status": 0, "msg": f'成功{"安装" if status else "卸载"} {module_name}'}
@@ -4,8 +4,10 @@ from typing import Union, Optional
 from fastapi import APIRouter, Header
 from fastapi.responses import JSONResponse, StreamingResponse
 
+from pagermaid.common.profiler import startup_profiler
 from pagermaid.common.status import get_status
 from pagermaid.common.system import run_eval
+from pagermaid.common.watchdog import loop_watchdog
 from pagermaid.config import Config
 from pagermaid.utils import execute
 from pagermaid.web.api.utils import authentication
@@ -62,3 +64,13 @@ async def run_sh(token: Optional[str] = Header(...), cmd: str = ""):
 @route.get("/status", response_class=JSONResponse, dependencies=[authentication()])
 async def status():
     return (await get_status()).dict()
+
+
+@route.get("/startup", response_class=JSONResponse, dependencies=[authentication()])
+async def startup():
+    return startup_profiler.dict()
+
+
+@route.get("/watchdog", response_class=JSONResponse, dependencies=[authentication()])
+async def watchdog():
+    return loop_watchdog.dict()
@@ -17,6 +17,9 @@ from amis import (
     InputText,
     DisplayModeEnum,
     Horizontal,
+    Table,
+    TableColumn,
+    Tpl,
 )
 
 from pagermaid.config import Config
@@ -166,12 +169,40 @@ status = Service(
             Property.Item(label="Bot 运行时间", content="${run_time}"),
             Property.Item(label="CPU占用率", content="${cpu_percent}"),
             Property.Item(label="RAM占用率", content="${ram_percent}"),
-            Property.Item(label="SWAP占用率", content="${swap_percent}", span=2),
+            Property.Item(label="SWAP占用率", content="${swap_percent}"),
+            Property.Item(label="事件循环延迟 (平均 / 最大)", content="${loop_lag}"),
+            Property.Item(label="事件循环阻塞次数", content="${loop_blocks}", span=2),
         ],
     ),
 )
 
-page_detail = Page(title="", body=[logo, operation_button, Divider(), status])
+command_metrics = Service(
+    api="/pagermaid/api/command_metrics",
+    interval=10000,
+    silentPolling=True,
+    body=[
+        Tpl(tpl="<b>命令统计</b>（正在运行：${in_flight}，耗时单位：毫秒）"),
+        Table(
+            source="${rows}",
+            placeholder="暂无命令统计",
+            columns=[
+                TableColumn(name="command", label="命令", sortable=True),
+                TableColumn(name="calls", label="调用", sortable=True),
+                TableColumn(name="errors", label="错误", sortable=True),
+                TableColumn(name="flood_waits", label="FloodWait", sortable=True),
+                TableColumn(name="parse", label="解析", sortable=True),
+                TableColumn(name="pre_hooks", label="前置钩子", sortable=True),
+                TableColumn(name="handler", label="处理", sortable=True),
+                TableColumn(name="post_hooks", label="后置钩子", sortable=True),
+            ],
+        ),
+    ],
+)
+
+page_detail = Page(
+    title="",
+    body=[logo, operation_button, Divider(), status, Divider(), command_metrics],
+)
 page = PageSchema(
     url="/home", label="首页", icon="fa fa-home", isDefaultPage=True, schema=page_detail
 )
@@ -59,9 +59,7 @@ cards_curd = CardsCRUD(
     title="",
     syncLocation=False,
     api="/pagermaid/api/get_ignore_group_list",
-    loadDataOnce=True,
-    source="${groups | filter:title:match:keywords_name}",
-    filter={"body": [InputText(name="keywords_name", label="群组名")]},
+    filter={"body": [InputText(name="keywords", label="群组名 / 用户名 / ID")]},
     perPage=12,
     autoJumpToTopOnPagerChange=True,
     placeholder="群组列表为空",
@@ -74,6 +72,6 @@ page = PageSchema(
     icon="fa fa-ban",
     label="忽略群组",
     schema=Page(
-        title="忽略群组", subTitle="忽略后，Bot 不再响应指定群组的消息（群组列表将会缓存一小时）", body=cards_curd
+        title="忽略群组", subTitle="忽略后，Bot 不再响应指定群组的消息（群组列表由对话索引维护，可使用 ,stats refresh 重建）", body=cards_curd
     ),
 )
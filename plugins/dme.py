@@ -1,10 +1,8 @@
 """ Module to message deletion. """
 
-import contextlib
-
 from pagermaid import read_context
 from pagermaid.enums import Client, Message
-from pagermaid.listener import listener, _lock
+from pagermaid.listener import listener
 from pagermaid.modules.prune import self_prune
 from pagermaid.utils import lang
 
@@ -18,7 +16,5 @@ from pagermaid.utils import lang
 )
 async def dme(bot: Client, message: Message):
     """Deletes specific amount of messages you sent."""
-    async with _lock:
-        with contextlib.suppress(Exception):
-            del read_context[(message.chat.id, message.id)]
+    read_context.discard((message.chat.id, message.id))
     await self_prune(bot, message)
@@ -11,6 +11,7 @@ from pyrogram.errors import UsernameNotOccupied, UsernameInvalid
 from pyrogram.types import User, Chat
 
 from pagermaid.single_utils import sqlite, safe_remove
+from pagermaid.services import executor
 from pagermaid.listener import listener
 from pagermaid.utils import client, Message, lang
 
@@ -35,7 +36,7 @@ configFilePath = f"plugins{sep}eat{sep}config.json"
 configFileRemoteUrlKey = "eat.configFileRemoteUrl"
 
 
-async def eat_it(context, user, base, mask, photo, number, layer=0):
+def paste_photo(base, mask, photo, number):
     mask_size = mask.size
     photo_size = photo.size
     if mask_size[0] < photo_size[0] and mask_size[1] < photo_size[1]:
@@ -60,6 +61,23 @@ async def eat_it(context, user, base, mask, photo, number, layer=0):
         base = photoBg
     else:
         base.paste(mask1, (numberPosition[0], numberPosition[1]), mask1)
+    return base
+
+
+def resize_base(base):
+    temp = base.size[0] if base.size[0] > base.size[1] else base.size[1]
+    if temp != 512:
+        scale = 512 / temp
+        base = base.resize(
+            (int(base.size[0] * scale), int(base.size[1] * scale)), Image.LANCZOS
+        )
+    return base
+
+
+async def eat_it(context, user, base, mask, photo, number, layer=0):
+    # PIL 处理放到线程池，避免阻塞事件循环
+    base = await executor.run_thread(paste_photo, base, mask, photo, number)
+    numberPosition = positions[str(number)]
 
     # 增加判断是否有第二个头像孔
     isContinue = len(numberPosition) > 2 and layer == 0
@@ -80,14 +98,7 @@ async def eat_it(context, user, base, mask, photo, number, layer=0):
             context, user, base, maskImg, markImg, numberPosition[2], layer + 1
         )
 
-    temp = base.size[0] if base.size[0] > base.size[1] else base.size[1]
-    if temp != 512:
-        scale = 512 / temp
-        base = base.resize(
-            (int(base.size[0] * scale), int(base.size[1] * scale)), Image.LANCZOS
-        )
-
-    return base
+    return await executor.run_thread(resize_base, base)
 
 
 async def updateConfig(context):
@@ -463,7 +474,7 @@ async def eat(client_: Client, context: Message):
         result = await eat_it(
             context, context.from_user, eatImg, maskImg, markImg, number
         )
-        result.save(f"plugins{sep}eat{sep}eat.webp")
+        await executor.run_thread(result.save, f"plugins{sep}eat{sep}eat.webp")
         safe_remove(f"plugins{sep}eat{sep}" + str(target_user_id) + ".jpg")
         safe_remove(f"plugins{sep}eat{sep}" + str(target_user_id) + ".png")
         safe_remove(f"plugins{sep}eat{sep}" + str(from_user_id) + ".jpg")
@@ -28,7 +28,7 @@ from typing import Optional, List, Union
 import pyrogram
 from pyrogram.enums import ChatType
 
-from pagermaid.single_utils import get_sudo_list
+from pagermaid.single_utils import get_sudo_set
 from pagermaid.scheduler import add_delete_message_job
 from ..methods.get_dialogs_list import get_dialogs_list as get_dialogs_list_func
 from ..methods.read_chat_history import read_chat_history as read_chat_history_func
@@ -288,7 +288,7 @@ class Message(pyrogram.types.Message):
         no_reply: bool = None,
     ) -> "Message":
         msg = None
-        sudo_users = get_sudo_list()
+        sudo_users = get_sudo_set()
         reply_to = self.reply_to_message
         from_id = self.chat.id
         is_self = False
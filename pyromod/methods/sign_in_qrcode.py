@@ -10,6 +10,7 @@ from pyrogram.session import Auth, Session
 from pyrogram.utils import ainput
 
 from pagermaid import Config
+from pagermaid.common.executor import executor
 from pyromod.utils.errors import QRCodeWebNeedPWDError, QRCodeWebCodeError
 
 
@@ -103,7 +104,7 @@ async def authorize_by_qrcode(
         if isinstance(qrcode, str):
             qr_obj = QRCode(qrcode)
             try:
-                qr_obj.png("data/qrcode.png", scale=6)
+                await executor.run_thread(qr_obj.png, "data/qrcode.png", scale=6)
             except Exception:
                 print("Save qrcode.png failed.")
             print(qr_obj.terminal())
@@ -0,0 +1,67 @@
+""" Compare the command router with the old per-command regex fan-out.
+
+Run from the repository root: python -m utils.bench_router [commands] [rounds]
+"""
+
+import asyncio
+import sys
+from timeit import default_timer
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from pagermaid.common.router import command_filter, command_router
+
+MESSAGES = {
+    "plain text": "just a normal outgoing message, nothing to see here",
+    "matching cmd": ",cmd100 some arguments",
+    'unknown ",cmd"': ",nosuchcommand arguments",
+}
+
+
+def regex_filters(commands):
+    """The filters listener() used to build: one regex per prefix and command."""
+    result = []
+    for command in commands:
+        result.append(filters.regex(rf"^(,|，){command}(?: |$)([\s\S]*)"))
+        result.append(filters.regex(rf"^/{command}(?: |$)([\s\S]*)"))
+    return result
+
+
+def routed_filters(commands):
+    result = []
+    for command in commands:
+        command_router.register(command)
+        result.append(command_filter(command))
+        result.append(command_filter(command, sudo=True))
+    return result
+
+
+async def run(flts, text: str, rounds: int) -> float:
+    """Microseconds of filter work per message, every handler is checked."""
+    start = default_timer()
+    for _ in range(rounds):
+        message = Message(id=1, text=text)
+        for flt in flts:
+            await flt(None, message)
+    return (default_timer() - start) / rounds * 1e6
+
+
+async def main(count: int, rounds: int):
+    commands = [f"cmd{i}" for i in range(count)]
+    fan_out = regex_filters(commands)
+    routed = routed_filters(commands)
+    print(f"{count} registered commands, base + sudo filters, {rounds} rounds")
+    for name, text in MESSAGES.items():
+        old = await run(fan_out, text, rounds)
+        new = await run(routed, text, rounds)
+        print(f"  {name:<16} fan-out {old:7.1f}us  routed {new:7.1f}us")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 220,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+        )
+    )